@@ -2,70 +2,220 @@ import asyncio
 import logging
 import ssl
 from http import HTTPStatus
-from typing import Union, Tuple, Optional
+from typing import Union, Tuple, Optional, Dict, NamedTuple, Type, TypeVar
 
 import aiohttp
 import certifi
-from botocore.auth import SigV4Auth
-from botocore.awsrequest import AWSRequest
 
 from . import config
-from ..types import ContentType
+from ..types import BasePollyObject, ContentType
 from ..types.method import Method
 from ..utils import json, case
-from ..utils.credentials import get_credentials
+from ..utils.concurrency import AdaptiveConcurrencyLimiter
+from ..utils.credentials import CredentialsProvider
 from ..utils.exceptions import get_exception, ResponseTypeException, JSONDecodeException, AioHTTPException
 from ..utils.mixins import ContextInstanceMixin
+from ..utils.rate_limit import RateLimiter
+from ..utils.retry import RetryPolicy
+from ..utils.signer import SigV4Signer
 
 log = logging.getLogger('aiopolly')
 
+T = TypeVar('T', bound=BasePollyObject)
+
+
+def _create_ssl_context() -> ssl.SSLContext:
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+class ConnectionPoolStats(NamedTuple):
+    open: int
+    idle: int
+    acquired: int
+    waiters: int
+    limit: int
+    limit_per_host: int
+
 
 class AmazonAPIClient(ContextInstanceMixin):
     _service_name = config.SERVICE_NAME
     _base_url_template = config.BASE_URL_TEMPLATE
 
     _exception_header = config.EXCEPTION_HEADER
+    _text_payload_key = config.TEXT_PAYLOAD_KEY
 
-    _trust_api_responses = config.TRUST_API_RESPONSES
     _convert_to_snake = config.CONVERT_TO_SNAKE_CASE
 
     def __init__(self, region: str,
+                 base_url: Optional[str],
                  access_key: Optional[str],
                  secret_key: Optional[str],
+                 retry_policy: Optional[RetryPolicy],
+                 rate_limits: Optional[Dict[Union[Method, str], RateLimiter]],
+                 concurrency_limiter: Optional[AdaptiveConcurrencyLimiter],
+                 trust_api_responses: bool,
+                 connection_limit: int,
+                 connection_limit_per_host: int,
+                 keepalive_timeout: Optional[float],
+                 dns_cache_ttl: Optional[int],
+                 ssl_context: Optional[ssl.SSLContext],
                  loop: Optional[asyncio.AbstractEventLoop]):
 
         self.region = region
 
-        self.base_url = self._base_url_template.format(
-            service_name=self._service_name,
+        if base_url is None:
+            base_url = self._base_url_template.format(
+                service_name=self._service_name,
+                region=self.region,
+            )
+        self.base_url = base_url.rstrip('/')
+
+        # Credentials are resolved off the event loop before the first request
+        self.credentials_provider = CredentialsProvider(access_key, secret_key)
+        self.__signer = SigV4Signer(
+            credentials=self.credentials_provider,
             region=self.region,
+            service=self._service_name
         )
 
-        self.__signer = SigV4Auth(
-            credentials=get_credentials(access_key, secret_key),
-            service_name=self._service_name,
-            region_name=self.region
-        )
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limits = {getattr(method, 'name', method): limiter for method, limiter in (rate_limits or {}).items()}
+        self.concurrency_limiter = concurrency_limiter
+        self.trust_api_responses = trust_api_responses
 
-        if not loop:
-            loop = asyncio.get_event_loop()
+        # Event loop, SSL context and session are created on first use or in __aenter__
         self.loop = loop
-
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-        connector = aiohttp.TCPConnector(ssl=ssl_context, loop=self.loop)
-        self.session = aiohttp.ClientSession(connector=connector, loop=self.loop, json_serialize=json.dumps)
+        self.ssl_context = ssl_context
+        self._connector_params = dict(
+            limit=connection_limit,
+            limit_per_host=connection_limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            use_dns_cache=dns_cache_ttl != 0,
+            ttl_dns_cache=dns_cache_ttl,
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
 
         self.set_current(self)
 
-    def __get_signed_headers(self, url: str, request_method: str = None, payload: str = None):
-        request = AWSRequest(method=request_method, url=url, data=payload)
-        self.__signer.add_auth(request)
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        HTTP session, created on first access.
+        Note that creating it outside of async with / coroutines loads SSL context synchronously.
+        """
+        if self._session is None:
+            self._create_session()
+        return self._session
 
-        return dict(request.headers.items())
+    @property
+    def connector(self) -> aiohttp.TCPConnector:
+        return self.session.connector
 
-    async def request(self, method: Method, payload: dict = None, params: dict = None
-                      ) -> Tuple[Union[dict, bytes, None], aiohttp.ClientResponse]:
+    async def __aenter__(self):
+        await self._setup()
+        await self.credentials_provider.load()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def _setup(self):
+        """
+        Creates session, loading SSL context (which reads CA certificates from disk) in executor
+        """
+        if self.ssl_context is None:
+            ssl_context = await (self.loop or asyncio.get_event_loop()).run_in_executor(None, _create_ssl_context)
+            if self.ssl_context is None:
+                self.ssl_context = ssl_context
+        if self._session is None:
+            self._create_session()
+
+    def _create_session(self):
+        if self.loop is None:
+            self.loop = asyncio.get_event_loop()
+        if self.ssl_context is None:
+            self.ssl_context = _create_ssl_context()
+
+        connector = aiohttp.TCPConnector(ssl=self.ssl_context, loop=self.loop, **self._connector_params)
+        self._session = aiohttp.ClientSession(connector=connector, loop=self.loop, json_serialize=json.dumps)
+
+    @property
+    def pool_stats(self) -> ConnectionPoolStats:
+        """
+        Snapshot of the connection pool state
+        """
+        if self._session is None:
+            return ConnectionPoolStats(open=0, idle=0, acquired=0, waiters=0,
+                                       limit=self._connector_params['limit'],
+                                       limit_per_host=self._connector_params['limit_per_host'])
+
+        connector = self.connector
+        # aiohttp doesn't provide public API for this, so private attributes are used
+        idle = sum(len(connections) for connections in getattr(connector, '_conns', {}).values())
+        acquired = len(getattr(connector, '_acquired', ()))
+        waiters = sum(len(host_waiters) for host_waiters in getattr(connector, '_waiters', {}).values())
+
+        return ConnectionPoolStats(
+            open=idle + acquired,
+            idle=idle,
+            acquired=acquired,
+            waiters=waiters,
+            limit=connector.limit,
+            limit_per_host=connector.limit_per_host
+        )
+
+    async def warmup(self, connections: int = 1) -> int:
+        """
+        Opens connections to API and keeps them in the pool, so first requests don't wait for DNS, TCP and TLS,
+        also loads credentials and prepares request signer.
+
+        Note that idle connections are closed after keepalive_timeout.
+
+        :param connections: number of connections to open, limited by connection_limit
+        :return: number of idle connections in the pool
+        """
+        await self._setup()
+        await self.credentials_provider.load()
+        self.__get_signed_headers(self.base_url, 'GET')
+
+        if self.connector.limit:
+            connections = min(connections, self.connector.limit)
+        if self.connector.limit_per_host:
+            connections = min(connections, self.connector.limit_per_host)
+
+        await asyncio.gather(*(self._open_connection() for _ in range(connections)))
+
+        return self.pool_stats.idle
+
+    async def _open_connection(self):
+        try:
+            # Any response will do, the point is to keep connection alive after it
+            async with self.session.head(self.base_url) as response:
+                await response.read()
+        except aiohttp.ClientError as e:
+            raise AioHTTPException(url=self.base_url, cause=e)
+
+    def __get_signed_headers(self, url: str, request_method: str = None, payload: str = None) -> Dict[str, str]:
+        return self.__signer.sign(request_method, url, payload)
+
+    def _parse_result(self, model: Type[T], data: dict) -> T:
+        """
+        Creates object from API response, skipping validation if API responses are trusted
+        """
+        if self.trust_api_responses:
+            return model.construct_trusted(data)
+        return model(**data)
 
+    async def _wait_rate_limit(self, method: Method, payload: dict = None):
+        rate_limiter = self.rate_limits.get(method.name)
+        if rate_limiter is None:
+            return
+
+        text = payload.get(self._text_payload_key) if payload else None
+        await rate_limiter.acquire(characters=len(text) if text else 0)
+
+    def _prepare_request(self, method: Method, payload: dict = None, params: dict = None
+                         ) -> Tuple[str, str, Optional[str], dict]:
         log.debug('Preparing request to API. method: %s, paylod: %s, params: %s', method, payload, params)
 
         url = method.get_url(self.base_url, params)
@@ -78,6 +228,47 @@ class AmazonAPIClient(ContextInstanceMixin):
 
         headers = self.__get_signed_headers(url, request_method, payload_json)
 
+        return url, request_method, payload_json, headers
+
+    async def request(self, method: Method, payload: dict = None, params: dict = None
+                      ) -> Tuple[Union[dict, bytes, None], aiohttp.ClientResponse]:
+        return await self.retry_policy.run(method, self._request, method, payload, params)
+
+    async def stream(self, method: Method, payload: dict = None, params: dict = None) -> aiohttp.ClientResponse:
+        """
+        Same as request(), but doesn't read the response body on success.
+        Caller owns the returned response and must release it after reading.
+        """
+        return await self.retry_policy.run(method, self._stream, method, payload, params)
+
+    async def _request(self, method: Method, payload: dict = None, params: dict = None
+                       ) -> Tuple[Union[dict, bytes, None], aiohttp.ClientResponse]:
+        if self._session is None:
+            await self._setup()
+        await self.credentials_provider.load()
+        await self._wait_rate_limit(method, payload)
+
+        if self.concurrency_limiter is None:
+            return await self._send_request(method, payload, params)
+        async with self.concurrency_limiter.slot():
+            return await self._send_request(method, payload, params)
+
+    async def _stream(self, method: Method, payload: dict = None, params: dict = None) -> aiohttp.ClientResponse:
+        if self._session is None:
+            await self._setup()
+        await self.credentials_provider.load()
+        await self._wait_rate_limit(method, payload)
+
+        # Slot is held until response headers are received, reading the body is up to the caller
+        if self.concurrency_limiter is None:
+            return await self._send_stream(method, payload, params)
+        async with self.concurrency_limiter.slot():
+            return await self._send_stream(method, payload, params)
+
+    async def _send_request(self, method: Method, payload: dict = None, params: dict = None
+                            ) -> Tuple[Union[dict, bytes, None], aiohttp.ClientResponse]:
+        url, request_method, payload_json, headers = self._prepare_request(method, payload, params)
+
         try:
             log.debug('Sending request to API "%s": [%s]', url, payload_json)
             async with self.session.request(method=request_method,
@@ -90,6 +281,31 @@ class AmazonAPIClient(ContextInstanceMixin):
 
         return content, response
 
+    async def _send_stream(self, method: Method, payload: dict = None, params: dict = None) -> aiohttp.ClientResponse:
+        url, request_method, payload_json, headers = self._prepare_request(method, payload, params)
+
+        try:
+            log.debug('Sending streaming request to API "%s": [%s]', url, payload_json)
+            response = await self.session.request(method=request_method,
+                                                  url=url,
+                                                  data=payload_json,
+                                                  headers=headers)
+        except aiohttp.ClientError as e:
+            raise AioHTTPException(url=url, payload=payload, cause=e)
+
+        try:
+            if response.status not in range(HTTPStatus.OK, HTTPStatus.BAD_REQUEST) \
+                    or response.content_type not in method.expected_content_types:
+                await self.get_content(url, method, payload, response)
+        except aiohttp.ClientError as e:
+            response.release()
+            raise AioHTTPException(url=url, payload=payload, cause=e)
+        except BaseException:
+            response.release()
+            raise
+
+        return response
+
     async def get_content(self, url: str, method: Method, payload: dict, response: aiohttp.ClientResponse):
         log.debug('Getting content for "%s": [%d]', url, response.status)
 
@@ -134,4 +350,6 @@ class AmazonAPIClient(ContextInstanceMixin):
         raise api_exception(url=url, payload=payload, content=content, response=response)
 
     async def close(self):
-        await self.session.close()
+        self.credentials_provider.close()
+        if self._session is not None:
+            await self._session.close()
@@ -4,5 +4,14 @@ BASE_URL_TEMPLATE = 'https://{service_name}.{region}.amazonaws.com'
 CHARACTERS_HEADER = 'x-amzn-RequestCharacters'
 EXCEPTION_HEADER = 'x-amzn-ErrorType'
 
+TEXT_PAYLOAD_KEY = 'Text'
+
 TRUST_API_RESPONSES = False
 CONVERT_TO_SNAKE_CASE = True
+
+STREAM_CHUNK_SIZE = 4096
+
+CONNECTION_LIMIT = 100
+CONNECTION_LIMIT_PER_HOST = 0
+KEEPALIVE_TIMEOUT = 15
+DNS_CACHE_TTL = 10
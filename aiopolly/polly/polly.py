@@ -1,12 +1,18 @@
 import asyncio
-from typing import Union, List
+import ssl
+from typing import Union, List, Dict, Type
 
 from . import api
 from . import config
 from .. import types
-from ..utils import case, json
+from ..utils import json
+from ..utils.cache.base import BaseCache, copy_speech
+from ..utils.concurrency import AdaptiveConcurrencyLimiter
 from ..utils.converter.base import BaseConverter
-from ..utils.payload import generate_params
+from ..utils.payload import get_request_key
+from ..utils.rate_limit import RateLimiter
+from ..utils.retry import RetryPolicy
+from ..utils.singleflight import SingleFlight
 
 
 class Methods:
@@ -18,12 +24,13 @@ class Methods:
     DescribeVoices = types.Method(
         endpoint='/v1/voices',
         request_method='GET',
+        query_params=('include_additional_language_codes', 'language_code', 'next_token'),
         expected_content_types=types.ContentType.application_json
     )
     GetLexicon = types.Method(
         endpoint_template='/v1/lexicons/{LexiconName}',
         request_method='GET',
-        expected_keys='GetLexicon',
+        expected_keys={'lexicon_key': 'Lexicon', 'lexicon_attributes_key': 'LexiconAttributes'},
         expected_content_types=types.ContentType.application_json
     )
     GetSpeechSynthesisTask = types.Method(
@@ -35,27 +42,38 @@ class Methods:
     ListLexicons = types.Method(
         endpoint='/v1/lexicons',
         request_method='GET',
+        query_params=('next_token',),
         expected_content_types=types.ContentType.application_json
     )
     ListSpeechSynthesisTasks = types.Method(
         endpoint='/v1/synthesisTasks',
         request_method='GET',
+        query_params=('max_results', 'next_token', 'status'),
         expected_content_types=types.ContentType.application_json,
     )
     PutLexicon = types.Method(
         endpoint_template='/v1/lexicons/{LexiconName}',
         request_method='PUT',
+        payload_params=('content',),
+        required_params=('content',),
         no_data_on_success=True
     )
     StartSpeechSynthesisTask = types.Method(
         endpoint='/v1/synthesisTasks',
         request_method='POST',
+        idempotent=False,
+        payload_params=('text', 'output_s3_key_prefix', 'output_s3_bucket_name', 'voice_id', 'output_format',
+                        'sample_rate', 'speech_mark_types', 'text_type', 'language_code', 'lexicon_names', 'engine'),
+        required_params=('text', 'output_s3_bucket_name', 'voice_id', 'output_format'),
         expected_keys='SynthesisTask',
         expected_content_types=types.ContentType.application_json
     )
     SynthesizeSpeech = types.Method(
         endpoint='/v1/speech',
         request_method='POST',
+        payload_params=('text', 'voice_id', 'output_format', 'sample_rate', 'speech_mark_types', 'text_type',
+                        'language_code', 'lexicon_names', 'engine'),
+        required_params=('text', 'voice_id', 'output_format'),
         expected_content_types=types.params.AUDIO_CONTENT_TYPES
     )
 
@@ -72,10 +90,16 @@ class Polly(api.AmazonAPIClient):
                     aws_access_key_id = your_access_key
                     aws_secret_access_key = your_secret_key
             '''
+
+    Session, SSL context and credentials are set up on first request, or in advance when used as context manager,
+    which also closes the session on exit:
+        async with Polly(voice_id=VoiceID.Joanna) as polly:
+            speech = await polly.synthesize_speech('Hello!')
     """
 
     methods = Methods
     _requested_characters_header = config.CHARACTERS_HEADER
+    _stream_chunk_size = config.STREAM_CHUNK_SIZE
 
     def __init__(self,
                  voice_id: str = None,
@@ -92,9 +116,24 @@ class Polly(api.AmazonAPIClient):
                  sns_topic_arn: str = None,
                  include_additional_language_codes: bool = False,
                  region: Union[types.Region, str] = types.Region.eu_central_1.value,
+                 base_url: str = None,
                  access_key: str = None,
                  secret_key: str = None,
                  converter: BaseConverter = None,
+                 cache: BaseCache = None,
+                 retry_policy: RetryPolicy = None,
+                 rate_limits: Dict[Union[types.Method, str], RateLimiter] = None,
+                 concurrency_limiter: AdaptiveConcurrencyLimiter = None,
+                 coalesce_requests: bool = True,
+                 trust_api_responses: bool = config.TRUST_API_RESPONSES,
+                 speech_class: Type[Union[types.Speech, types.CompactSpeech]] = types.Speech,
+                 speech_marks_class: Type[Union[types.SpeechMarksList,
+                                               types.SpeechMarksTable]] = types.SpeechMarksList,
+                 connection_limit: int = config.CONNECTION_LIMIT,
+                 connection_limit_per_host: int = config.CONNECTION_LIMIT_PER_HOST,
+                 keepalive_timeout: float = config.KEEPALIVE_TIMEOUT,
+                 dns_cache_ttl: int = config.DNS_CACHE_TTL,
+                 ssl_context: ssl.SSLContext = None,
                  loop: asyncio.AbstractEventLoop = None,
                  **defaults):
         """
@@ -105,6 +144,7 @@ class Polly(api.AmazonAPIClient):
             :param secret_key: AWS secret key, requires :param access_key;
             :param region: AWS server region, default is 'eu-central-1'. For available regions see:
                 https://docs.aws.amazon.com/AmazonRDS/latest/UserGuide/Concepts.RegionsAndAvailabilityZones.html
+            :param base_url: API url to use instead of regional AWS endpoint, e.g. url of aiopolly.testing.server
 
         Default API params, used when method params remain empty:
             For original docs see: https://docs.aws.amazon.com/en_us/polly/latest/dg/API_Operations.html
@@ -121,16 +161,57 @@ class Polly(api.AmazonAPIClient):
             :param sns_topic_arn: ARN for the SNS topic for providing status notification for a speech synthesis task.
             :param include_additional_language_codes: value indicating whether to return any bilingual speech that use
                 the specified language as an additional language.
+
+        Other params:
+            :param converter: instance of BaseConverter subclass, used to convert synthesized speech;
+            :param cache: instance of BaseCache subclass, used to store synthesized speech
+                and return it without sending request to API when same speech is requested again;
+            :param retry_policy: instance of RetryPolicy, used to retry throttled and failed requests,
+                by default up to 3 attempts are made;
+            :param rate_limits: instances of RateLimiter by methods (or their names), used to wait for
+                requests and characters quota on the client side instead of being throttled by API;
+            :param concurrency_limiter: instance of AdaptiveConcurrencyLimiter, used to limit number of requests
+                in flight, adapting the limit to throttling responses;
+            :param coalesce_requests: indicates whether concurrent synthesize_speech calls with same params
+                should share one API request;
+            :param trust_api_responses: indicates whether objects should be created from API responses
+                without validation, which is several times faster for large responses;
+            :param speech_class: class of synthesized speech, types.Speech or types.CompactSpeech,
+                which is faster to create and uses less memory, but has no validation;
+            :param speech_marks_class: class of synthesized speech marks, types.SpeechMarksList
+                or types.SpeechMarksTable, which stores marks in arrays and indexes them by type and time.
+
+        Connection pool params:
+            :param connection_limit: total number of simultaneous connections, 0 means no limit;
+            :param connection_limit_per_host: number of simultaneous connections to one host, 0 means no limit;
+            :param keepalive_timeout: seconds to keep idle connections open,
+                None means keeping them until closed by server;
+            :param dns_cache_ttl: seconds to cache resolved DNS entries, None means caching forever, 0 disables cache;
+            :param ssl_context: SSL context to use (e.g. shared between clients), by default it's created with certifi.
         """
 
         super().__init__(
             region=region,
+            base_url=base_url,
             access_key=access_key,
             secret_key=secret_key,
+            retry_policy=retry_policy,
+            rate_limits=rate_limits,
+            concurrency_limiter=concurrency_limiter,
+            trust_api_responses=trust_api_responses,
+            connection_limit=connection_limit,
+            connection_limit_per_host=connection_limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            dns_cache_ttl=dns_cache_ttl,
+            ssl_context=ssl_context,
             loop=loop
         )
 
         self.converter = converter
+        self.cache = cache
+        self.speech_class = speech_class
+        self.speech_marks_class = speech_marks_class
+        self._single_flight = SingleFlight() if coalesce_requests else None
 
         # Setting default params
         self.defaults = dict(
@@ -161,9 +242,10 @@ class Polly(api.AmazonAPIClient):
 
         :param lexicon_name: The name of the lexicon to delete. Must be an existing lexicon in the region.
         """
-        params = generate_params(lexicon_name=lexicon_name)
+        method = self.methods.DeleteLexicon
+        params, _ = method.request_schema.build(locals())
 
-        await self.request(self.methods.DeleteLexicon, params=params)
+        await self.request(method, params=params)
 
     async def describe_voices(self, include_additional_language_codes: bool = None,
                               language_code: str = None, next_token: str = None) -> types.VoicesList:
@@ -179,10 +261,11 @@ class Polly(api.AmazonAPIClient):
         :param language_code: The language identification tag for filtering the list of speech returned.
         :param next_token: An opaque pagination token returned from the previous DescribeVoices operation.
         """
-        params = generate_params(**locals(), defaults=self.defaults)
-        result, response = await self.request(self.methods.DescribeVoices, params=params)
+        method = self.methods.DescribeVoices
+        params, _ = method.request_schema.build(locals(), defaults=self.defaults)
+        result, response = await self.request(method, params=params)
 
-        return types.VoicesList(**result)
+        return self._parse_result(types.VoicesList, result)
 
     async def get_lexicon(self, lexicon_name: str) -> types.Lexicon:
         """
@@ -194,11 +277,11 @@ class Polly(api.AmazonAPIClient):
         """
 
         method = self.methods.GetLexicon
-        params = generate_params(lexicon_name=lexicon_name)
+        params, _ = method.request_schema.build(locals())
         result, response = await self.request(method, params=params)
         lexicon_attributes = result[method.lexicon_attributes_key]
 
-        return types.Lexicon(**result[method.lexicon_key], attributes=lexicon_attributes)
+        return self._parse_result(types.Lexicon, dict(result[method.lexicon_key], attributes=lexicon_attributes))
 
     async def get_speech_synthesis_task(self, task_id: str) -> types.SynthesisTask:
         """
@@ -212,10 +295,10 @@ class Polly(api.AmazonAPIClient):
         """
 
         method = self.methods.GetSpeechSynthesisTask
-        params = generate_params(task_id=task_id)
-        result, response = await self.request(self.methods.GetSpeechSynthesisTask, params=params)
+        params, _ = method.request_schema.build(locals())
+        result, response = await self.request(method, params=params)
 
-        return types.SynthesisTask(**result[method.synthesis_task_key])
+        return self._parse_result(types.SynthesisTask, result[method.synthesis_task_key])
 
     async def list_lexicons(self, next_token: str = None) -> types.LexiconsList:
         """
@@ -227,10 +310,11 @@ class Polly(api.AmazonAPIClient):
                If present, indicates where to continue the list of lexicons.
         """
 
-        params = generate_params(next_token=next_token)
-        result, response = await self.request(self.methods.ListLexicons, params=params)
+        method = self.methods.ListLexicons
+        params, _ = method.request_schema.build(locals())
+        result, response = await self.request(method, params=params)
 
-        return types.LexiconsList(**result)
+        return self._parse_result(types.LexiconsList, result)
 
     async def list_speech_synthesis_tasks(self, max_results: int = None,
                                           next_token: str = None,
@@ -247,10 +331,11 @@ class Polly(api.AmazonAPIClient):
         :param status: Status of the speech synthesis tasks returned in a List operation
         """
 
-        params = generate_params(**locals())
-        result, response = await self.request(self.methods.ListSpeechSynthesisTasks, params=params)
+        method = self.methods.ListSpeechSynthesisTasks
+        params, _ = method.request_schema.build(locals())
+        result, response = await self.request(method, params=params)
 
-        return types.SynthesisTasksList(**result)
+        return self._parse_result(types.SynthesisTasksList, result)
 
     async def put_lexicon(self, lexicon_name: str, content: str):
         """
@@ -264,10 +349,10 @@ class Polly(api.AmazonAPIClient):
         :param content: Content of the PLS lexicon as string data.
         """
 
-        params = generate_params(lexicon_name=lexicon_name)
-        payload = generate_params(content=content)
+        method = self.methods.PutLexicon
+        params, payload = method.request_schema.build(locals())
 
-        await self.request(self.methods.PutLexicon, payload=payload, params=params)
+        await self.request(method, payload=payload, params=params)
 
     async def start_speech_synthesis_task(self, text: str,
                                           output_s3_key_prefix: str = None,
@@ -303,9 +388,10 @@ class Polly(api.AmazonAPIClient):
         :return:
         """
 
-        payload = generate_params(**locals(), defaults=self.defaults)
-        result, response = await self.request(self.methods.StartSpeechSynthesisTask, payload=payload)
-        return types.SynthesisTask(**result)
+        method = self.methods.StartSpeechSynthesisTask
+        _, payload = method.request_schema.build(locals(), defaults=self.defaults)
+        result, response = await self.request(method, payload=payload)
+        return self._parse_result(types.SynthesisTask, result[method.synthesis_task_key])
 
     async def synthesize_speech(self, text: str,
                                 voice_id: str = None,
@@ -318,7 +404,7 @@ class Polly(api.AmazonAPIClient):
                                 auto_convert: bool = None,
                                 engine: str = None,
                                 **converter_params
-                                ) -> Union[types.Speech, types.SpeechMarksList]:
+                                ) -> Union[types.Speech, types.SpeechMarksList, types.SpeechMarksTable]:
         """
         Synthesizes UTF-8 input, plain text or SSML, to a stream of bytes. SSML input must be valid, well-formed SSML.
         Some alphabets might not be available with all the speech
@@ -337,26 +423,142 @@ class Polly(api.AmazonAPIClient):
         :param auto_convert: param indicate whether speech will be auto converted after synthesis
         :param converter_params: params which will be placed in self.converter.convert method
         """
-        payload = generate_params(**locals(), defaults=self.defaults, use_camel=False,
-                                  exclude={'auto_convert', 'converter_params'})
+        method = self.methods.SynthesizeSpeech
+        schema = method.request_schema
+        payload = schema.collect(locals(), defaults=self.defaults)
 
-        content, response = await self.request(self.methods.SynthesizeSpeech, payload=case.to_camel(payload))
+        if self.converter and (auto_convert or self.converter.auto_convert and auto_convert is not False):
+            convert = True
+        elif auto_convert or converter_params:
+            raise RuntimeError(f'Cannot find converter in {self}, to use it please specify one')
+        else:
+            convert = False
+
+        cache_key = None
+        if self.cache is not None and payload.get('output_format') != types.AudioFormat.json:
+            cache_key = get_request_key(payload, convert=convert, **converter_params)
+            speech = await self.cache.get(cache_key)
+            if speech is not None:
+                return speech
+
+        _, api_payload = schema.split(payload)
+        synthesis_args = method, payload, api_payload, convert, converter_params, cache_key
+        if self._single_flight is None:
+            content, speech = await self._synthesize_speech(*synthesis_args)
+        else:
+            # Speech is converted and cached once by the shared call, waiters only get their own copies of it
+            content, speech = await self._single_flight.do(
+                cache_key or get_request_key(payload, convert=convert, **converter_params),
+                self._synthesize_speech, *synthesis_args
+            )
+            if speech is not None:
+                speech = copy_speech(speech)
 
+        if speech is not None:
+            return speech
+
+        if issubclass(self.speech_marks_class, types.SpeechMarksTable):
+            return self.speech_marks_class.from_json_lines(content)
+        return self._parse_result(self.speech_marks_class, {'speech_marks': json.loads_lines(content)})
+
+    async def _synthesize_speech(self, method: types.Method, payload: dict, api_payload: dict,
+                                 convert: bool, converter_params: dict, cache_key: str = None):
+        """
+        Requests synthesis, returns response content and speech made of it, converted and cached if needed.
+        Speech is None for speech marks, which are parsed by each caller from the content.
+        """
+        content, response = await self.request(method, payload=api_payload)
         if response.content_type == types.ContentType.application_x_json_stream:
-            return types.SpeechMarksList(
-                speech_marks=[json.loads(line) for line in content.split(b'\n')[:-1]]
-            )
+            return content, None
 
-        speech = types.Speech(
+        speech = self.speech_class(
             content_type=response.content_type,
             request_characters=response.headers[self._requested_characters_header],
             audio_stream=content,
             **payload
         )
 
-        if self.converter and (auto_convert or self.converter.auto_convert and auto_convert is not False):
-            return await self.converter.convert(speech, **converter_params)
-        elif auto_convert or converter_params:
-            raise RuntimeError(f'Cannot find converter in {self}, to use it please specify one')
+        if convert:
+            speech = await self.converter.convert(speech, **converter_params)
+
+        if cache_key is not None:
+            await self.cache.set(cache_key, speech)
+
+        return content, speech
+
+    async def stream_speech(self, text: str,
+                            voice_id: str = None,
+                            output_format: Union[types.AudioFormat, str] = None,
+                            sample_rate: str = None,
+                            speech_mark_types: List[Union[types.SpeechMarkTypes, str]] = None,
+                            text_type: Union[types.TextType, str] = None,
+                            language_code: Union[types.LanguageCode, str] = None,
+                            lexicon_names: list = None,
+                            engine: str = None,
+                            chunk_size: int = None
+                            ) -> types.SpeechStream:
+        """
+        Same as synthesize_speech, but returns as soon as API starts responding,
+        so audio can be consumed chunk by chunk while it's still being received.
+        Returned stream must be closed after use, e.g. with 'async with' statement.
 
-        return speech
+        :param text: Input text to synthesize.
+        :param voice_id: Voice ID to use for the synthesis.
+        :param output_format: The format in which the returned output will be encoded.
+        :param sample_rate: The audio frequency specified in Hz.
+        :param speech_mark_types: The type of speech marks returned for the input text.
+        :param text_type: Specifies whether the input text is plain text or SSML. The default value is plain text.
+        :param language_code: Optional language code for the Synthesize Speech request.
+        :param lexicon_names: List of one or more pronunciation lexicon names to apply during synthesis
+        :param engine: Speech engine to use, either 'standard' or 'neural'. Some voices are not available with 'neural'.
+
+        :param chunk_size: max size of each yielded audio chunk in bytes
+        """
+        method = self.methods.SynthesizeSpeech
+        payload = method.request_schema.collect(locals(), defaults=self.defaults)
+        _, api_payload = method.request_schema.split(payload)
+
+        response = await self.stream(method, payload=api_payload)
+
+        return types.SpeechStream(
+            response=response,
+            content_type=types.ContentType(response.content_type),
+            request_characters=int(response.headers[self._requested_characters_header]),
+            chunk_size=chunk_size or self._stream_chunk_size,
+            **payload
+        )
+
+    async def stream_speech_marks(self, text: str,
+                                  speech_mark_types: List[Union[types.SpeechMarkTypes, str]] = None,
+                                  voice_id: str = None,
+                                  text_type: Union[types.TextType, str] = None,
+                                  language_code: Union[types.LanguageCode, str] = None,
+                                  lexicon_names: list = None,
+                                  engine: str = None
+                                  ) -> types.SpeechMarksStream:
+        """
+        Same as synthesize_speech with output_format json, but returns as soon as API starts responding,
+        so speech marks can be consumed one by one while they are still being received.
+        Returned stream must be closed after use, e.g. with 'async with' statement.
+
+        :param text: Input text to synthesize.
+        :param speech_mark_types: The type of speech marks returned for the input text.
+        :param voice_id: Voice ID to use for the synthesis.
+        :param text_type: Specifies whether the input text is plain text or SSML. The default value is plain text.
+        :param language_code: Optional language code for the Synthesize Speech request.
+        :param lexicon_names: List of one or more pronunciation lexicon names to apply during synthesis
+        :param engine: Speech engine to use, either 'standard' or 'neural'. Some voices are not available with 'neural'.
+        """
+        output_format = types.AudioFormat.json
+        method = self.methods.SynthesizeSpeech
+        payload = method.request_schema.collect(locals(), defaults=self.defaults)
+        _, api_payload = method.request_schema.split(payload)
+
+        response = await self.stream(method, payload=api_payload)
+
+        return types.SpeechMarksStream(
+            response=response,
+            request_characters=int(response.headers[self._requested_characters_header]),
+            trusted=self.trust_api_responses,
+            **payload
+        )
@@ -0,0 +1,3 @@
+from .server import FakePollyServer
+
+__all__ = ['FakePollyServer']
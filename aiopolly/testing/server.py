@@ -0,0 +1,447 @@
+"""
+Stand-in for Amazon Polly API, which can be used for offline testing and benchmarking.
+
+Usage:
+    async with FakePollyServer(latency=0.05, throughput=64 * 1024, throttle_rate=0.01) as server:
+        polly = Polly(base_url=server.url, access_key='fake', secret_key='fake')
+        ...
+
+Or as a standalone server:
+    $ python -m aiopolly.testing --port 8080 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import datetime
+import hashlib
+import itertools
+import random
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from aiohttp import web
+
+from .. import types
+from ..polly.config import CHARACTERS_HEADER, EXCEPTION_HEADER
+from ..utils import json
+
+__all__ = ['FakePollyServer']
+
+MAX_TEXT_LENGTH = 3000
+
+WORDS_PER_SECOND = 2.5
+WORD_DURATION_MS = int(1000 / WORDS_PER_SECOND)
+
+# Bytes of audio per second of speech, approximately matching real Polly output
+AUDIO_BYTES_PER_SECOND = {
+    types.AudioFormat.mp3: 6000,  # 48 kbps
+    types.AudioFormat.ogg_vorbis: 5000,
+    types.AudioFormat.pcm: 32000,  # 16 kHz, 16-bit, mono
+}
+
+FORMAT_CONTENT_TYPES = {
+    types.AudioFormat.mp3: types.ContentType.audio_mpeg,
+    types.AudioFormat.ogg_vorbis: types.ContentType.audio_ogg,
+    types.AudioFormat.pcm: types.ContentType.audio_pcm,
+    types.AudioFormat.json: types.ContentType.application_x_json_stream,
+}
+
+VISEMES = 'pteEiaoou@'
+
+SENTENCE_PATTERN = re.compile(r'[^.!?]+[.!?]*')
+WORD_PATTERN = re.compile(r'\w+')
+SSML_TAG_PATTERN = re.compile(r'<[^<]+>')
+SSML_MARK_PATTERN = re.compile(r'<mark\s+name="([^"]*)"\s*/>')
+
+
+class FakePollyServer:
+    """
+    aiohttp server implementing endpoints of Polly.methods with deterministic responses:
+        - audio size and duration are proportional to number of words in text,
+        - speech marks are valid application/x-json-stream lines,
+        - lexicons and synthesis tasks are stored in memory.
+
+    Request signatures are not verified.
+    """
+
+    def __init__(self,
+                 latency: float = 0.0,
+                 throughput: Optional[float] = None,
+                 throttle_rate: float = 0.0,
+                 error_rate: float = 0.0,
+                 voices_count: Optional[int] = None,
+                 chunk_size: int = 16 * 1024,
+                 seed: int = 0):
+        """
+        :param latency: seconds before response headers are sent
+        :param throughput: bytes per second at which audio is sent, None means as fast as possible
+        :param throttle_rate: share of requests (0..1) rejected with ThrottlingException
+        :param error_rate: share of requests (0..1) failed with 5xx errors
+        :param voices_count: number of voices returned by DescribeVoices, by default all of types.VoiceID
+        :param chunk_size: size of audio chunks written to response
+        :param seed: seed for throttling and errors injection
+        """
+        self.latency = latency
+        self.throughput = throughput
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+
+        self.requests: Dict[str, int] = {}
+        self.lexicons: Dict[str, Tuple[str, datetime.datetime]] = {}
+        self.synthesis_tasks: Dict[str, dict] = {}
+
+        self._random = random.Random(seed)
+        self._task_ids = itertools.count(1)
+        self._voices = list(self._generate_voices(voices_count))
+        self._runner: Optional[web.AppRunner] = None
+        self.url: Optional[str] = None
+
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.router.add_post('/v1/speech', self.synthesize_speech)
+        self.app.router.add_get('/v1/voices', self.describe_voices)
+        self.app.router.add_get('/v1/lexicons', self.list_lexicons)
+        self.app.router.add_get('/v1/lexicons/{LexiconName}', self.get_lexicon)
+        self.app.router.add_put('/v1/lexicons/{LexiconName}', self.put_lexicon)
+        self.app.router.add_delete('/v1/lexicons/{LexiconName}', self.delete_lexicon)
+        self.app.router.add_get('/v1/synthesisTasks', self.list_speech_synthesis_tasks)
+        self.app.router.add_post('/v1/synthesisTasks', self.start_speech_synthesis_task)
+        self.app.router.add_get('/v1/synthesisTasks/{TaskId}', self.get_speech_synthesis_task)
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        :param port: port to listen on, 0 means any free port
+        :return: base url of the server
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        self.url = f'http://{host}:{port}'
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        route = request.match_info.route.resource
+        name = f'{request.method} {route.canonical if route is not None else request.path}'
+        self.requests[name] = self.requests.get(name, 0) + 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        chance = self._random.random()
+        if chance < self.throttle_rate:
+            return self._error(400, 'ThrottlingException', 'Rate exceeded')
+        if chance < self.throttle_rate + self.error_rate:
+            if self._random.random() < 0.5:
+                return self._error(500, 'ServiceFailureException', 'An unknown condition has caused a service failure.')
+            return self._error(503, 'ServiceUnavailableException', 'Service is unavailable')
+
+        return await handler(request)
+
+    async def synthesize_speech(self, request: web.Request) -> web.StreamResponse:
+        data = await self._read_json(request)
+        text, voice_id, output_format = data.get('Text'), data.get('VoiceId'), data.get('OutputFormat')
+        if not text or not voice_id or not output_format:
+            return self._validation_error('Text, VoiceId and OutputFormat are required')
+        if output_format not in FORMAT_CONTENT_TYPES:
+            return self._validation_error(f'Unsupported OutputFormat: {output_format}')
+
+        speech_mark_types = data.get('SpeechMarkTypes') or []
+        if speech_mark_types and output_format != types.AudioFormat.json:
+            return self._error(400, 'MarksNotSupportedForFormatException',
+                               'Speech marks are not supported for the OutputFormat selected.')
+        if output_format == types.AudioFormat.json and not speech_mark_types:
+            return self._validation_error('SpeechMarkTypes are required for json OutputFormat')
+
+        is_ssml = data.get('TextType') == types.TextType.ssml
+        characters = len(SSML_TAG_PATTERN.sub('', text)) if is_ssml else len(text)
+        if characters > MAX_TEXT_LENGTH:
+            return self._error(400, 'TextLengthExceededException', 'Maximum text length has been exceeded')
+
+        if output_format == types.AudioFormat.json:
+            body = b''.join(json.dumps(mark).encode() + b'\n'
+                            for mark in self.generate_speech_marks(text, speech_mark_types, is_ssml))
+        else:
+            body = self.generate_audio(text, voice_id, output_format, data.get('SampleRate'))
+
+        response = web.StreamResponse(headers={
+            'Content-Type': FORMAT_CONTENT_TYPES[output_format],
+            CHARACTERS_HEADER: str(characters),
+        })
+        response.content_length = len(body)
+        await response.prepare(request)
+
+        for start in range(0, len(body), self.chunk_size):
+            chunk = body[start:start + self.chunk_size]
+            await response.write(chunk)
+            if self.throughput:
+                await asyncio.sleep(len(chunk) / self.throughput)
+
+        await response.write_eof()
+        return response
+
+    async def describe_voices(self, request: web.Request) -> web.Response:
+        language_code = request.query.get('LanguageCode')
+        include_additional = request.query.get('IncludeAdditionalLanguageCodes', '').lower() == 'true'
+
+        voices = self._voices
+        if language_code:
+            voices = [
+                voice for voice in voices
+                if voice['LanguageCode'] == language_code
+                or include_additional and language_code in voice.get('AdditionalLanguageCodes', ())
+            ]
+        return self._json({'Voices': voices})
+
+    async def list_lexicons(self, request: web.Request) -> web.Response:
+        return self._json({
+            'Lexicons': [
+                {'Name': name, 'Attributes': self._lexicon_attributes(name)}
+                for name in sorted(self.lexicons)
+            ]
+        })
+
+    async def get_lexicon(self, request: web.Request) -> web.Response:
+        name = request.match_info['LexiconName']
+        if name not in self.lexicons:
+            return self._lexicon_not_found()
+
+        return self._json({
+            'Lexicon': {'Name': name, 'Content': self.lexicons[name][0]},
+            'LexiconAttributes': self._lexicon_attributes(name),
+        })
+
+    async def put_lexicon(self, request: web.Request) -> web.Response:
+        data = await self._read_json(request)
+        if not data.get('Content'):
+            return self._validation_error('Content is required')
+
+        last_modified = datetime.datetime.now(datetime.timezone.utc)
+        self.lexicons[request.match_info['LexiconName']] = data['Content'], last_modified
+        return self._json({})
+
+    async def delete_lexicon(self, request: web.Request) -> web.Response:
+        if self.lexicons.pop(request.match_info['LexiconName'], None) is None:
+            return self._lexicon_not_found()
+        return self._json({})
+
+    async def list_speech_synthesis_tasks(self, request: web.Request) -> web.Response:
+        status = request.query.get('Status')
+        tasks = [task for task in self.synthesis_tasks.values() if status is None or task['TaskStatus'] == status]
+
+        max_results = int(request.query.get('MaxResults', 100))
+        start = int(request.query.get('NextToken', 0))
+        result = {'SynthesisTasks': tasks[start:start + max_results]}
+        if start + max_results < len(tasks):
+            result['NextToken'] = str(start + max_results)
+        return self._json(result)
+
+    async def start_speech_synthesis_task(self, request: web.Request) -> web.Response:
+        data = await self._read_json(request)
+        if not all(data.get(key) for key in ('Text', 'VoiceId', 'OutputFormat', 'OutputS3BucketName')):
+            return self._validation_error('Text, VoiceId, OutputFormat and OutputS3BucketName are required')
+
+        task_id = f'{next(self._task_ids):08x}-0000-4000-8000-000000000000'
+        extension = 'marks' if data['OutputFormat'] == types.AudioFormat.json else data['OutputFormat']
+        task = {
+            'CreationTime': datetime.datetime.now(datetime.timezone.utc).timestamp(),
+            'LanguageCode': data.get('LanguageCode', types.LanguageCode.en_US.value),
+            'LexiconNames': data.get('LexiconNames', []),
+            'OutputFormat': data['OutputFormat'],
+            'OutputUri': f"https://s3.amazonaws.com/{data['OutputS3BucketName']}/"
+                         f"{data.get('OutputS3KeyPrefix', '')}{task_id}.{extension}",
+            'RequestCharacters': len(data['Text']),
+            'SampleRate': data.get('SampleRate', '22050'),
+            'SnsTopicArn': data.get('SnsTopicArn', ''),
+            'SpeechMarkTypes': data.get('SpeechMarkTypes', []),
+            'TaskId': task_id,
+            'TaskStatus': types.SynthesisTaskStatus.completed.value,
+            'TaskStatusReason': '',
+            'TextType': data.get('TextType', types.TextType.text.value),
+            'VoiceId': data['VoiceId'],
+        }
+        self.synthesis_tasks[task_id] = task
+        return self._json({'SynthesisTask': task})
+
+    async def get_speech_synthesis_task(self, request: web.Request) -> web.Response:
+        task = self.synthesis_tasks.get(request.match_info['TaskId'])
+        if task is None:
+            return self._error(400, 'SynthesisTaskNotFoundException',
+                               'The Speech Synthesis task with requested Task ID cannot be found.')
+        return self._json({'SynthesisTask': task})
+
+    @staticmethod
+    def generate_audio(text: str, voice_id: str, output_format: str, sample_rate: str = None) -> bytes:
+        """
+        Returns deterministic bytes with size of real audio for given text
+        """
+        duration = max(len(WORD_PATTERN.findall(text)) / WORDS_PER_SECOND, 0.5)
+        bytes_per_second = AUDIO_BYTES_PER_SECOND[output_format]
+        if output_format == types.AudioFormat.pcm and sample_rate:
+            bytes_per_second = int(sample_rate) * 2
+        size = int(duration * bytes_per_second)
+
+        block = hashlib.sha256(f'{voice_id}:{output_format}:{text}'.encode()).digest()
+        return (block * (size // len(block) + 1))[:size]
+
+    @staticmethod
+    def generate_speech_marks(text: str, speech_mark_types: List[str], is_ssml: bool = False) -> Iterator[dict]:
+        """
+        Yields speech marks ordered by time, word i starts at i * WORD_DURATION_MS.
+        Start and end are byte offsets in UTF-8 encoded text, as in real API.
+        """
+        encoded_offsets = _Utf8Offsets(text)
+        word_index = 0
+
+        # Replacing tags with spaces to keep offsets of spoken text
+        spoken_text = SSML_TAG_PATTERN.sub(lambda tag: ' ' * len(tag.group()), text) if is_ssml else text
+
+        for sentence in SENTENCE_PATTERN.finditer(spoken_text):
+            words = list(WORD_PATTERN.finditer(sentence.group()))
+            if not words:
+                continue
+
+            time = word_index * WORD_DURATION_MS
+            if is_ssml and types.SpeechMarkTypes.ssml in speech_mark_types:
+                for mark in SSML_MARK_PATTERN.finditer(text, sentence.start(), sentence.end()):
+                    start, end = encoded_offsets[mark.start()], encoded_offsets[mark.end()]
+                    yield {'time': time, 'type': 'ssml', 'start': start, 'end': end, 'value': mark.group(1)}
+
+            if types.SpeechMarkTypes.sentence in speech_mark_types:
+                value = sentence.group().strip()
+                start = sentence.start() + sentence.group().index(value)
+                end = start + len(value)
+                yield {'time': time, 'type': 'sentence', 'start': encoded_offsets[start], 'end': encoded_offsets[end],
+                       'value': text[start:end]}
+
+            for word in words:
+                time = word_index * WORD_DURATION_MS
+                word_index += 1
+
+                if types.SpeechMarkTypes.word in speech_mark_types:
+                    start = encoded_offsets[sentence.start() + word.start()]
+                    end = encoded_offsets[sentence.start() + word.end()]
+                    yield {'time': time, 'type': 'word', 'start': start, 'end': end, 'value': word.group()}
+
+                if types.SpeechMarkTypes.viseme in speech_mark_types:
+                    visemes = word.group()[:4]
+                    for n, letter in enumerate(visemes):
+                        yield {'time': time + n * WORD_DURATION_MS // len(visemes), 'type': 'viseme',
+                               'value': VISEMES[ord(letter) % len(VISEMES)]}
+
+    @staticmethod
+    def _generate_voices(count: Optional[int]) -> Iterator[dict]:
+        voice_ids = list(types.VoiceID)
+        language_codes = list(types.LanguageCode)
+        count = len(voice_ids) if count is None else count
+
+        for n in range(count):
+            voice_id = voice_ids[n % len(voice_ids)].value
+            if n >= len(voice_ids):
+                voice_id += str(n // len(voice_ids))
+            language_code = language_codes[n % len(language_codes)].value
+
+            voice = {
+                'Gender': types.Gender.Female.value if n % 2 else types.Gender.Male.value,
+                'Id': voice_id,
+                'LanguageCode': language_code,
+                'LanguageName': f'{language_code} language',
+                'Name': voice_id,
+            }
+            if n % 5 == 0:
+                voice['AdditionalLanguageCodes'] = [language_codes[(n + 1) % len(language_codes)].value]
+            yield voice
+
+    def _lexicon_attributes(self, name: str) -> dict:
+        content, last_modified = self.lexicons[name]
+        return {
+            'Alphabet': types.Alphabet.ipa.value,
+            'LanguageCode': types.LanguageCode.en_US.value,
+            'LastModified': last_modified.timestamp(),
+            'LexemesCount': content.count('<lexeme>'),
+            'LexiconArn': f'arn:aws:polly:us-east-1:000000000000:lexicon/{name}',
+            'Size': len(content.encode()),
+        }
+
+    def _lexicon_not_found(self) -> web.Response:
+        return self._error(404, 'LexiconNotFoundException', 'Amazon Polly can\'t find the specified lexicon.')
+
+    def _validation_error(self, message: str) -> web.Response:
+        return self._error(400, 'ValidationException', f'1 validation error detected: {message}')
+
+    @staticmethod
+    async def _read_json(request: web.Request) -> dict:
+        body = await request.read()
+        return json.loads(body) if body else {}
+
+    @staticmethod
+    def _json(data: dict) -> web.Response:
+        return web.Response(body=json.dumps(data).encode(), content_type=types.ContentType.application_json)
+
+    @staticmethod
+    def _error(status: int, error_type: str, message: str) -> web.Response:
+        return web.Response(
+            status=status,
+            body=json.dumps({'message': message}).encode(),
+            content_type=types.ContentType.application_json,
+            headers={EXCEPTION_HEADER: f'{error_type}:'}
+        )
+
+
+class _Utf8Offsets:
+    """
+    Maps character offsets to byte offsets in UTF-8 encoded text
+    """
+
+    __slots__ = 'offsets',
+
+    def __init__(self, text: str):
+        self.offsets = [0]
+        for char in text:
+            self.offsets.append(self.offsets[-1] + len(char.encode()))
+
+    def __getitem__(self, index: int) -> int:
+        return self.offsets[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in for Amazon Polly API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds before response headers are sent')
+    parser.add_argument('--throughput', type=float, default=None, help='bytes per second at which audio is sent')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='share of throttled requests')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests failed with 5xx')
+    parser.add_argument('--voices-count', type=int, default=None, help='number of voices in DescribeVoices')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakePollyServer(
+        latency=args.latency,
+        throughput=args.throughput,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        voices_count=args.voices_count,
+        seed=args.seed,
+    )
+    print(f'Fake Polly API is running on http://{args.host}:{args.port}', flush=True)
+    web.run_app(server.app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,8 @@ from .params import (
     AudioFormat, ContentType, LanguageCode, Alphabet, Region,
     TextType, SpeechMarkTypes, SynthesisTaskStatus, VoiceID, Gender
 )
-from .speech import Speech, SpeechMarks, SpeechMarksList
+from .speech import CompactSpeech, Speech, SpeechMarks, SpeechMarksList, SpeechStream
+from .speech_marks import SpeechMarksStream, SpeechMarksTable
 from .synthesis_task import SynthesisTask, SynthesisTasksList
 from .voice import VoicesList, Voice
 
@@ -13,6 +14,7 @@ __all__ = [
     'Alphabet',
     'AudioFormat',
     'BasePollyObject',
+    'CompactSpeech',
     'ContentType',
     'LanguageCode',
     'Lexicon',
@@ -24,6 +26,9 @@ __all__ = [
     'SpeechMarks',
     'SpeechMarkTypes',
     'SpeechMarksList',
+    'SpeechMarksStream',
+    'SpeechMarksTable',
+    'SpeechStream',
     'SynthesisTask',
     'SynthesisTasksList',
     'SynthesisTaskStatus',
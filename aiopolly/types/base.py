@@ -1,8 +1,13 @@
+import copy
 import datetime
+import enum
 import functools
 import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
 
 from pydantic import BaseModel, Extra
+from pydantic.datetime_parse import parse_datetime
+from pydantic.fields import Shape
 from pydantic.json import timedelta_isoformat
 
 from ..utils import json
@@ -12,8 +17,37 @@ __all__ = ['BasePollyObject']
 
 log = logging.getLogger('aiopolly')
 
+T = TypeVar('T', bound='BasePollyObject')
+
+# Field name and value parser (None if value is used as is) by keys, which field can be populated with
+TrustedFields = Dict[str, Tuple[str, Optional[Callable[[Any], Any]]]]
+# Names and default values of all fields
+TrustedDefaults = List[Tuple[str, Any]]
+
+_trusted_schemas: Dict[type, Tuple[TrustedFields, TrustedDefaults]] = {}
+
+
+def get_instance_cache(obj) -> dict:
+    """
+    Returns dict for values derived from obj, stored in its '_cache' slot,
+    so they are computed once per instance and freed together with it
+    """
+    try:
+        return obj._cache
+    except AttributeError:  # Slot is not set until the first access
+        cache = {}
+        object.__setattr__(obj, '_cache', cache)
+        return cache
+
 
 class BasePollyObject(BaseModel):
+    # Not a field: pydantic keeps values in __dict__, this slot holds derived values cached per instance
+    __slots__ = ('_cache',)
+
+    # Names of fields identifying object, used by __hash__ and __eq__, all fields by default.
+    # Hash is cached, so these fields must be reassigned, not mutated in place
+    __hash_fields__: Tuple[str, ...] = ()
+
     class Config:
         arbitrary_types_allowed = True
         extra = Extra.allow
@@ -27,19 +61,46 @@ class BasePollyObject(BaseModel):
         }
 
     @property
-    @functools.lru_cache()
     def polly(self):
         """
         :rtype: aiopolly.polly.Polly
         """
-        from .. import Polly
-        polly = Polly.get_current()
+        cache = get_instance_cache(self)
+        polly = cache.get('polly')
         if polly is None:
-            raise RuntimeError("Can't get polly instance from context. "
-                               "You can fix it with setting current instance: "
-                               "'Polly.set_current(polly_instance)'")
+            polly = cache['polly'] = get_current_polly()
         return polly
 
+    @classmethod
+    def construct_trusted(cls: Type[T], data: dict) -> T:
+        """
+        Creates object from trusted data (e.g. API response) without validation.
+
+        Keys are mapped to fields with precomputed table, nested objects are constructed the same way,
+        enums and datetimes are still converted, so result is equal to one created with validation.
+        Missing fields are set to their defaults (None for required ones), unknown keys are kept as is.
+        """
+        fields, defaults = _trusted_schemas.get(cls) or _make_trusted_schema(cls)
+
+        values = {}
+        for key, value in data.items():
+            field = fields.get(key)
+            if field is None:
+                values[key] = value
+                continue
+
+            name, parse = field
+            if parse is not None and value is not None:
+                value = parse(value)
+            values[name] = value
+
+        fields_set = set(values)
+        for name, default in defaults:
+            if name not in values:
+                values[name] = default if default is None else copy.deepcopy(default)
+
+        return cls.construct(values, fields_set)
+
     def raw_dict(self):
         """
         :return: raw data that we get from AWS Polly API
@@ -47,23 +108,91 @@ class BasePollyObject(BaseModel):
         return json.loads(self.dict(by_alias=True))
 
     def __hash__(self):
-        def _hash(obj):
-            buf = 0
-            if isinstance(obj, list):
-                for item in obj:
-                    buf += _hash(item)
-            elif isinstance(obj, dict):
-                for dict_key, dict_value in obj.items():
-                    buf += hash(dict_key) + _hash(dict_value)
-            else:
-                try:
-                    buf += hash(obj)
-                except TypeError:  # Skip unhashable objects
-                    pass
-            return buf
-
-        result = 0
-        for key, value in sorted(self.fields.items()):
-            result += hash(key) + _hash(value)
-
-        return result
+        """
+        Hash of identifying fields (__hash_fields__), computed once and cached until any field is assigned
+        """
+        cache = get_instance_cache(self)
+        try:
+            return cache['hash']
+        except KeyError:
+            result = cache['hash'] = hash((type(self), self._identity()))
+            return result
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return super().__eq__(other)
+        if self is other:
+            return True
+        # Objects with different identity are never equal, so most comparisons end on cached hashes
+        return hash(self) == hash(other) and self.__dict__ == other.__dict__
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        cache = getattr(self, '_cache', None)
+        if cache:
+            cache.pop('hash', None)
+
+    def _identity(self) -> tuple:
+        values = self.__dict__
+        return tuple(make_hashable(values.get(name)) for name in self.__hash_fields__ or self.__fields__)
+
+
+def make_hashable(value):
+    """
+    Returns hashable equivalent of value: lists become tuples and dicts become frozensets of items,
+    other unhashable values are replaced with their type name, so they are skipped
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(make_hashable(item) for item in value)
+    if isinstance(value, dict):
+        return frozenset((key, make_hashable(item)) for key, item in value.items())
+    try:
+        hash(value)
+    except TypeError:
+        return type(value).__name__
+    return value
+
+
+def get_current_polly():
+    """
+    :rtype: aiopolly.polly.Polly
+    """
+    from .. import Polly
+    polly = Polly.get_current()
+    if polly is None:
+        raise RuntimeError("Can't get polly instance from context. "
+                           "You can fix it with setting current instance: "
+                           "'Polly.set_current(polly_instance)'")
+    return polly
+
+
+def _make_trusted_schema(model: Type[BasePollyObject]) -> Tuple[TrustedFields, TrustedDefaults]:
+    fields: TrustedFields = {}
+    defaults: TrustedDefaults = []
+
+    for name, field in model.__fields__.items():
+        type_ = field.type_
+        if isinstance(type_, type) and issubclass(type_, BasePollyObject):
+            parse = type_.construct_trusted
+        elif isinstance(type_, type) and issubclass(type_, enum.Enum):
+            parse = type_
+        elif type_ is datetime.datetime:
+            parse = parse_datetime
+        else:
+            parse = None
+
+        if parse is not None and field.shape is Shape.LIST:
+            parse = functools.partial(_parse_list, parse)
+        elif field.shape is not Shape.SINGLETON:
+            parse = None
+
+        fields[field.alias] = name, parse
+        fields[name] = name, parse
+        defaults.append((name, field.default))
+
+    _trusted_schemas[model] = fields, defaults
+    return fields, defaults
+
+
+def _parse_list(parse: Callable[[Any], Any], values: list) -> list:
+    return [parse(value) for value in values]
@@ -1,15 +1,135 @@
-import functools
 import re
-from typing import List, Tuple, Union, Dict
-from urllib.parse import urlencode
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import quote, urlencode
 
 from pydantic import validator
 
-from .base import BasePollyObject
+from .base import BasePollyObject, get_instance_cache
 from .params import ContentType
-from ..utils.case import to_snake, string_to_snake
-
-__all__ = ['Method']
+from ..utils.case import to_snake, string_to_camel, string_to_snake
+
+__all__ = ['Method', 'RequestSchema', 'Route']
+
+_PLACEHOLDER = re.compile('{(.*?)}')
+
+
+class RequestSchema:
+    """
+    Request params and payload of a method, compiled once: API names of all arguments are computed in advance,
+    so building a request is a flat lookup of each argument in values and defaults.
+
+    Usage:
+        params, payload = method.request_schema.build(locals(), defaults=self.defaults)
+    """
+
+    __slots__ = 'params', 'payload', 'required', '_names'
+
+    def __init__(self, params: Iterable[str] = (), payload: Iterable[str] = (), required: Iterable[str] = ()):
+        """
+        :param params: names of arguments sent in url (endpoint template or query string)
+        :param payload: names of arguments sent in request body
+        :param required: names of arguments which must be filled
+        """
+        self.params: Tuple[Tuple[str, str], ...] = tuple((name, string_to_camel(name)) for name in params)
+        self.payload: Tuple[Tuple[str, str], ...] = tuple((name, string_to_camel(name)) for name in payload)
+        self.required = frozenset(required)
+        self._names = tuple(name for name, _ in self.params + self.payload)
+
+    def collect(self, values: dict, defaults: dict = None) -> dict:
+        """
+        Returns filled arguments by their names, empty ones are taken from defaults or skipped
+
+        :param values: arguments of method call, e.g. locals(), unknown names are ignored
+        :param defaults: default values by argument names
+        """
+        get_value = values.get
+        get_default = (defaults or {}).get
+        result = {}
+        for name in self._names:
+            value = get_value(name)
+            if value is None:
+                value = get_default(name)
+                if value is None:
+                    continue
+            result[name] = value
+
+        if not self.required.issubset(result):
+            unfilled_param = min(self.required.difference(result))
+            raise ValueError(f'Parameter "{unfilled_param}" is unfilled')
+        return result
+
+    def split(self, collected: dict) -> Tuple[dict, Optional[dict]]:
+        """
+        Returns url params and payload (None for methods without payload) with API names of collected arguments
+        """
+        params = {key: collected[name] for name, key in self.params if name in collected}
+        if not self.payload:
+            return params, None
+        return params, {key: collected[name] for name, key in self.payload if name in collected}
+
+    def build(self, values: dict, defaults: dict = None) -> Tuple[dict, Optional[dict]]:
+        return self.split(self.collect(values, defaults))
+
+
+class Route:
+    """
+    Endpoint of a method, compiled once: placeholders of the template are found in advance,
+    so building a url is a join of literal parts and quoted params, plus a query string for the rest of params.
+
+    Usage:
+        route = Route('/v1/lexicons/{LexiconName}')
+        endpoint = route.build({'LexiconName': 'my_lexicon'})
+    """
+
+    __slots__ = 'template', 'params', 'query_allowed', '_parts', '_param_names'
+
+    def __init__(self, template: str, query_allowed: bool = None):
+        """
+        :param template: endpoint with params in braces, e.g. '/v1/synthesisTasks/{TaskId}'
+        :param query_allowed: whether params not found in template are sent in query string,
+            by default they are allowed only for endpoints without params
+        """
+        parts = _PLACEHOLDER.split(template)
+        self.template = template
+        self.params: Tuple[str, ...] = tuple(parts[1::2])
+        self.query_allowed = not self.params if query_allowed is None else query_allowed
+        self._parts: Tuple[str, ...] = tuple(parts[0::2])
+        self._param_names = frozenset(self.params)
+
+    def build(self, params: dict = None) -> str:
+        """
+        :param params: values of template params (quoted, so any value is kept within its path segment)
+            and query string params
+        """
+        if not params:
+            if not self.params:
+                return self.template
+            params = {}
+
+        for key, value in params.items():
+            if value is None:
+                raise ValueError(f'Parameter "{key}" is unfilled')
+
+        if self.params:
+            missing = self._param_names.difference(params)
+            if missing:
+                unfilled_param = next(param for param in self.params if param in missing)
+                raise ValueError(f'Parameter "{unfilled_param}" not found in "{params}",'
+                                 f' needed params: {list(self.params)}')
+
+            parts = self._parts
+            url = parts[0] + ''.join(
+                quote(str(params[param]), safe='') + part for param, part in zip(self.params, parts[1:])
+            )
+        else:
+            url = self.template
+
+        if len(params) > len(self.params):
+            query = {key: value for key, value in params.items() if key not in self._param_names}
+            if not self.query_allowed:
+                raise ValueError(f'Unexpected parameters: {query}, allowed params: {list(self.params)}')
+            url += f'?{urlencode(query)}'
+        return url
 
 
 class Method(BasePollyObject):
@@ -20,58 +140,61 @@ class Method(BasePollyObject):
     expected_content_types: Union[ContentType, Tuple[ContentType, ...]] = ()
     expected_keys: Union[str, Dict[str, str]] = None
     no_data_on_success: bool = False
+    idempotent: bool = True
     url_params_allowed: bool = False
+    query_params: Tuple[str, ...] = ()
+    payload_params: Tuple[str, ...] = ()
+    required_params: Tuple[str, ...] = ()
+
+    @property
+    def route(self) -> Route:
+        """
+        Compiled on first use from endpoint or endpoint_template
+        """
+        cache = get_instance_cache(self)
+        route = cache.get('route')
+        if route is None:
+            if self.endpoint:
+                route = Route(self.endpoint)
+            elif not self.endpoint_template:
+                raise RuntimeError('Either endpoint or endpoint_template must be set')
+            else:
+                route = Route(self.endpoint_template, self.url_params_allowed)
+                if not route.params:
+                    raise RuntimeError(f'Params to fill not found in endpoint_template: {self.endpoint_template}')
+            cache['route'] = route
+        return route
 
     @property
-    @functools.lru_cache()
     def needed_endpoint_params(self) -> List[str]:
         if self.endpoint_template:
-            return re.findall(r'{(.*?)}', self.endpoint_template)
+            return list(self.route.params)
         return []
 
-    def get_url(self, base_url: str, params: dict = None) -> str:
-        endpoint_params, url_params = self._filter_params(params)
-        endpoint = self._get_endpoint(endpoint_params)
-
-        url = base_url + endpoint
-
-        if url_params:
-            url += f'?{urlencode(params)}'
-        return url
-
-    def _get_endpoint(self, endpoint_params=None) -> str:
-        if self.endpoint:
-            return self.endpoint
-        elif not self.endpoint_template:
-            raise RuntimeError(f'Both self.endpoint and self.endpoint_template can not not be empty')
-        elif not self.needed_endpoint_params:
-            raise RuntimeError(f'Params to fill not found in endpoint_template: {self.endpoint_template}')
-        elif not endpoint_params:
-            raise ValueError(f'endpoint_params can not be empty on method {self.name}')
-
-        return self.endpoint_template.format(**endpoint_params)
-
-    def _filter_params(self, params: dict) -> Tuple[dict, dict]:
-        params = params or {}
-        endpoint_params = {}
-        url_params = {}
-        for k, v in params.items():
-            if v is None:
-                raise ValueError(f'Parameter "{k}" is unfilled')
-
-            if k in self.needed_endpoint_params:
-                endpoint_params[k] = v
-            elif self.url_params_allowed or not self.needed_endpoint_params:
-                url_params[k] = v
-            else:
-                raise ValueError(f'Unexpected parameter: "{k}={v}", allowed params: {self.needed_endpoint_params}')
+    @property
+    def request_schema(self) -> RequestSchema:
+        """
+        Compiled on first use, endpoint template params are always required
+        """
+        cache = get_instance_cache(self)
+        schema = cache.get('schema')
+        if schema is None:
+            endpoint_params = [string_to_snake(param) for param in self.needed_endpoint_params]
+            schema = cache['schema'] = RequestSchema(
+                params=endpoint_params + list(self.query_params),
+                payload=self.payload_params,
+                required=endpoint_params + list(self.required_params),
+            )
+        return schema
 
-        unfilled_param = next((param for param in self.needed_endpoint_params if param not in endpoint_params), None)
-        if unfilled_param is not None:
-            raise ValueError(f'Parameter "{unfilled_param}" not found in "{endpoint_params}",'
-                             f' needed params: {self.needed_endpoint_params}')
+    def get_url(self, base_url: str, params: dict = None) -> str:
+        return base_url + self.route.build(params)
 
-        return endpoint_params, url_params
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        cache = get_instance_cache(self)
+        cache.pop('route', None)
+        cache.pop('schema', None)
 
     def __set_name__(self, owner, name):
         try:
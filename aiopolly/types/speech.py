@@ -1,16 +1,15 @@
 import datetime
-import functools
 import io
 import logging
 import os
-from typing import List, Union
+from typing import AsyncIterator, List, Type, Union
 
-import aiofiles
+import aiohttp
 
-from .base import BasePollyObject
+from .base import BasePollyObject, get_current_polly, get_instance_cache, make_hashable
 from .params import LanguageCode, AudioFormat, ContentType, TextType, SpeechMarkTypes
 
-__all__ = ['Speech', 'SpeechMarks', 'SpeechMarksList']
+__all__ = ['CompactSpeech', 'Speech', 'SpeechMarks', 'SpeechMarksList', 'SpeechStream']
 
 
 class ConvertParams(BasePollyObject):
@@ -20,22 +19,18 @@ class ConvertParams(BasePollyObject):
     info: str = None
 
 
-class Speech(BasePollyObject):
-    content_type: ContentType
-    request_characters: int
-    audio_stream: bytes
-    text: str
-    voice_id: str
-    output_format: AudioFormat
-    sample_rate: str = None
-    speech_mark_types: SpeechMarkTypes = None
-    text_type: TextType = None
-    language_code: LanguageCode = None
-    lexicon_names: List[str] = None
+class SpeechMixin:
+    """
+    Methods shared by Speech and CompactSpeech
+    """
 
-    converted: bool = False
-    converted_stream: bytes = None
-    converted_params: ConvertParams = None
+    __slots__ = ()
+
+    # Request params (and conversion) identify speech, so audio is never hashed
+    __hash_fields__ = (
+        'text', 'voice_id', 'output_format', 'sample_rate', 'speech_mark_types', 'text_type', 'language_code',
+        'lexicon_names', 'converted_params',
+    )
 
     async def convert(self, **kwargs):
         converter = self.polly.converter
@@ -51,16 +46,24 @@ class Speech(BasePollyObject):
 
     @property
     def converted_format(self):
-        return self.converted_params.to_format.split('_')[0].strip()
+        to_format = self.converted_params['to_format'] if isinstance(self.converted_params, dict) \
+            else self.converted_params.to_format
+        return to_format.split('_')[0].strip()
 
     @property
-    @functools.lru_cache()
     def clean_text(self):
         if self.text_type == 'text':
             return self.text
 
-        from ..utils.ssml import clean_text_from_ssml_tags
-        return clean_text_from_ssml_tags(self.text)
+        # Cached along with the text it was made of, so it's recomputed if text is changed
+        cache = get_instance_cache(self)
+        text, clean_text = cache.get('clean_text', (None, None))
+        if text is not self.text:
+            from ..utils.ssml import clean_text_from_ssml_tags
+            text = self.text
+            clean_text = clean_text_from_ssml_tags(text)
+            cache['clean_text'] = text, clean_text
+        return clean_text
 
     @property
     def bytes_io(self):
@@ -97,10 +100,184 @@ class Speech(BasePollyObject):
 
         logging.debug('Saving %s on disc' % filename)
 
+        import aiofiles
+
         async with aiofiles.open(filename, mode='wb') as file:
             await file.write(stream)
 
 
+class Speech(SpeechMixin, BasePollyObject):
+    content_type: ContentType
+    request_characters: int
+    audio_stream: bytes
+    text: str
+    voice_id: str
+    output_format: AudioFormat
+    sample_rate: str = None
+    speech_mark_types: SpeechMarkTypes = None
+    text_type: TextType = None
+    language_code: LanguageCode = None
+    lexicon_names: List[str] = None
+
+    converted: bool = False
+    converted_stream: bytes = None
+    converted_params: ConvertParams = None
+
+
+class CompactSpeech(SpeechMixin):
+    """
+    Lightweight alternative to Speech with the same API: no validation on creation and assignment,
+    no pydantic overhead per instance, audio streams are stored as given (bytes or memoryview) without copying.
+    converted_params is kept as dict.
+
+    Usage:
+        polly = Polly(speech_class=CompactSpeech)
+    """
+
+    __slots__ = (
+        'content_type', 'request_characters', 'audio_stream', 'text', 'voice_id', 'output_format', 'sample_rate',
+        'speech_mark_types', 'text_type', 'language_code', 'lexicon_names',
+        'converted', 'converted_stream', 'converted_params', 'extra', '_cache'
+    )
+
+    def __init__(self, content_type: str,
+                 request_characters: Union[int, str],
+                 audio_stream: Union[bytes, memoryview],
+                 text: str,
+                 voice_id: str,
+                 output_format: str,
+                 sample_rate: str = None,
+                 speech_mark_types: List[str] = None,
+                 text_type: str = None,
+                 language_code: str = None,
+                 lexicon_names: List[str] = None,
+                 converted: bool = False,
+                 converted_stream: Union[bytes, memoryview] = None,
+                 converted_params: dict = None,
+                 **extra):
+        self.content_type = content_type
+        self.request_characters = int(request_characters)
+        self.audio_stream = audio_stream
+        self.text = text
+        self.voice_id = voice_id
+        self.output_format = output_format
+        self.sample_rate = sample_rate
+        self.speech_mark_types = speech_mark_types
+        self.text_type = text_type
+        self.language_code = language_code
+        self.lexicon_names = lexicon_names
+        self.converted = converted
+        self.converted_stream = converted_stream
+        self.converted_params = converted_params
+        self.extra = extra
+
+    @property
+    def polly(self):
+        """
+        :rtype: aiopolly.polly.Polly
+        """
+        cache = get_instance_cache(self)
+        polly = cache.get('polly')
+        if polly is None:
+            polly = cache['polly'] = get_current_polly()
+        return polly
+
+    def dict(self, exclude: set = None) -> dict:
+        exclude = exclude or ()
+        result = {name: getattr(self, name) for name in self.__slots__
+                  if name not in ('extra', '_cache') and name not in exclude}
+        result.update((key, value) for key, value in self.extra.items() if key not in exclude)
+        return result
+
+    def copy(self) -> 'CompactSpeech':
+        return type(self)(**self.dict())
+
+    def __hash__(self):
+        # Not cached, as it would make every assignment slower, request params are cheap to hash anyway
+        return hash((type(self), tuple(make_hashable(getattr(self, name)) for name in self.__hash_fields__)))
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self is other or hash(self) == hash(other) and self.dict() == other.dict()
+
+    def __repr__(self):
+        return f'<{type(self).__name__} voice_id={self.voice_id!r} output_format={self.output_format!r} ' \
+               f'request_characters={self.request_characters} audio_stream={len(self.audio_stream)} bytes>'
+
+
+class SpeechStream:
+    """
+    Synthesized speech which audio is received from API chunk by chunk.
+    Content type and requested characters are known before the first chunk arrives.
+
+    Usage:
+        async with await polly.stream_speech(text) as stream:
+            async for chunk in stream:
+                player.feed(chunk)
+    """
+
+    __slots__ = 'response', 'content_type', 'request_characters', 'chunk_size', 'params'
+
+    def __init__(self, response: aiohttp.ClientResponse,
+                 content_type: ContentType,
+                 request_characters: int,
+                 chunk_size: int,
+                 **params):
+        self.response = response
+        self.content_type = content_type
+        self.request_characters = request_characters
+        self.chunk_size = chunk_size
+        self.params = params
+
+    async def iter_chunks(self, chunk_size: int = None) -> AsyncIterator[bytes]:
+        """
+        Yields audio chunks as soon as they are received, each chunk is at most chunk_size bytes long
+        """
+        try:
+            async for chunk in self.response.content.iter_chunked(chunk_size or self.chunk_size):
+                yield chunk
+        finally:
+            self.close()
+
+    async def read(self) -> bytes:
+        """
+        Reads the rest of the audio
+        """
+        try:
+            return await self.response.read()
+        finally:
+            self.close()
+
+    async def to_speech(self, speech_class: Type[Union[Speech, CompactSpeech]] = Speech
+                        ) -> Union[Speech, CompactSpeech]:
+        """
+        Reads the rest of the audio and returns it as a regular Speech (or CompactSpeech)
+        """
+        return speech_class(
+            content_type=self.content_type,
+            request_characters=self.request_characters,
+            audio_stream=await self.read(),
+            **self.params
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self.response.closed
+
+    def close(self):
+        self.response.release()
+
+    def __aiter__(self):
+        return self.iter_chunks()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
 class SpeechMarks(BasePollyObject):
     time: int
     type: SpeechMarkTypes
@@ -0,0 +1,262 @@
+import array
+import bisect
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import aiohttp
+
+from .params import SpeechMarkTypes
+from .speech import SpeechMarks, SpeechMarksList
+from ..utils import json
+
+__all__ = ['SpeechMarksStream', 'SpeechMarksTable']
+
+MARK_TYPES = list(SpeechMarkTypes)
+_TYPE_CODES = {mark_type.value: code for code, mark_type in enumerate(MARK_TYPES)}
+
+NO_OFFSET = -1  # Stored in starts and ends columns for marks without offsets (visemes)
+
+
+class SpeechMarksTable:
+    """
+    Columnar alternative to SpeechMarksList with the same API, for long texts with tens of thousands of marks.
+
+    Marks are stored in parallel arrays (time, start, end, type code and index of value in a table of unique values),
+    SpeechMarks objects are created only for marks which are actually accessed.
+    Rows of each type are indexed on first access, so getting marks of a type doesn't scan the whole table
+    and the mark of a type active at given time is found with binary search.
+
+    Usage:
+        polly = Polly(speech_marks_class=SpeechMarksTable)
+        marks = await polly.synthesize_speech(text, output_format=AudioFormat.json, speech_mark_types=['word'])
+        word = marks.mark_at(1500, SpeechMarkTypes.word)
+    """
+
+    __slots__ = 'times', 'starts', 'ends', 'type_codes', 'value_ids', 'values', '_value_ids', '_indexes'
+
+    def __init__(self, speech_marks: Iterable[dict] = ()):
+        """
+        :param speech_marks: marks as returned by API, ordered by time
+        """
+        self.times = array.array('q')
+        self.starts = array.array('q')
+        self.ends = array.array('q')
+        self.type_codes = array.array('B')
+        self.value_ids = array.array('L')
+        self.values: List[str] = []
+
+        self._value_ids: Dict[str, int] = {}
+        # Row numbers and times of rows by type code, built on first access
+        self._indexes: Dict[int, Tuple[array.array, array.array]] = {}
+
+        self.extend(speech_marks)
+
+    @classmethod
+    def from_json_lines(cls, content: bytes) -> 'SpeechMarksTable':
+        """
+        :param content: speech marks stream returned by API, one JSON object per line
+        """
+        return cls(json.loads_lines(content))
+
+    def append(self, mark: dict):
+        self.extend((mark,))
+
+    def extend(self, speech_marks: Iterable[dict]):
+        append_time, append_start, append_end = self.times.append, self.starts.append, self.ends.append
+        append_type, append_value_id = self.type_codes.append, self.value_ids.append
+        values, value_ids = self.values, self._value_ids
+
+        for mark in speech_marks:
+            value = mark['value']
+            value_id = value_ids.get(value)
+            if value_id is None:
+                value_id = value_ids[value] = len(values)
+                values.append(value)
+
+            type_code = _TYPE_CODES.get(mark['type'])
+            if type_code is None:
+                raise ValueError(f'Unknown speech mark type: {mark["type"]!r}')
+
+            append_time(mark['time'])
+            append_type(type_code)
+            start = mark.get('start')
+            append_start(NO_OFFSET if start is None else start)
+            end = mark.get('end')
+            append_end(NO_OFFSET if end is None else end)
+            append_value_id(value_id)
+
+        self._indexes.clear()
+
+    @property
+    def speech_marks(self) -> List[SpeechMarks]:
+        return [self._make_mark(row) for row in range(len(self))]
+
+    @property
+    def vesemes(self):
+        return self.get_marks(SpeechMarkTypes.viseme)
+
+    @property
+    def sentences(self):
+        return self.get_marks(SpeechMarkTypes.sentence)
+
+    @property
+    def words(self):
+        return self.get_marks(SpeechMarkTypes.word)
+
+    @property
+    def ssml(self):
+        return self.get_marks(SpeechMarkTypes.ssml)
+
+    def get_marks(self, mark_type: Union[SpeechMarkTypes, str]) -> List[SpeechMarks]:
+        rows, _ = self._get_index(mark_type)
+        return [self._make_mark(row) for row in rows]
+
+    def get_marks_values(self, mark_type: Union[SpeechMarkTypes, str]) -> List[str]:
+        rows, _ = self._get_index(mark_type)
+        values, value_ids = self.values, self.value_ids
+        return [values[value_ids[row]] for row in rows]
+
+    def get_marks_times(self, mark_type: Union[SpeechMarkTypes, str]) -> array.array:
+        _, times = self._get_index(mark_type)
+        return times
+
+    def row_at(self, time: int, mark_type: Union[SpeechMarkTypes, str]) -> Optional[int]:
+        """
+        Returns number of the last row of mark_type which started at or before time (in milliseconds),
+        None if there's no such row
+        """
+        rows, times = self._get_index(mark_type)
+        position = bisect.bisect_right(times, time)
+        return rows[position - 1] if position else None
+
+    def mark_at(self, time: int, mark_type: Union[SpeechMarkTypes, str]) -> Optional[SpeechMarks]:
+        """
+        Returns mark of mark_type (e.g. word or sentence) being spoken at time (in milliseconds)
+        """
+        row = self.row_at(time, mark_type)
+        return None if row is None else self._make_mark(row)
+
+    def to_list(self) -> SpeechMarksList:
+        return SpeechMarksList.construct_trusted({'speech_marks': [self.row_dict(row) for row in range(len(self))]})
+
+    def row_dict(self, row: int) -> dict:
+        mark = {
+            'time': self.times[row],
+            'type': MARK_TYPES[self.type_codes[row]].value,
+            'value': self.values[self.value_ids[row]],
+        }
+        start, end = self.starts[row], self.ends[row]
+        if start != NO_OFFSET:
+            mark['start'] = start
+        if end != NO_OFFSET:
+            mark['end'] = end
+        return mark
+
+    @property
+    def total_time(self):
+        return self.times[-1]
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self) -> Iterator[SpeechMarks]:
+        return map(self._make_mark, range(len(self)))
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [self._make_mark(row) for row in range(len(self))[item]]
+        return self._make_mark(range(len(self))[item])
+
+    def __repr__(self):
+        return f'<{type(self).__name__} marks={len(self)} values={len(self.values)}>'
+
+    def _make_mark(self, row: int) -> SpeechMarks:
+        return SpeechMarks.construct_trusted(self.row_dict(row))
+
+    def _get_index(self, mark_type: Union[SpeechMarkTypes, str]) -> Tuple[array.array, array.array]:
+        code = _TYPE_CODES.get(mark_type)
+        index = self._indexes.get(code)
+        if index is None:
+            type_codes = self.type_codes
+            rows = array.array('L', (row for row in range(len(type_codes)) if type_codes[row] == code)
+                               if code is not None else ())
+            times = self.times
+            index = self._indexes[code] = rows, array.array('q', (times[row] for row in rows))
+        return index
+
+
+class SpeechMarksStream:
+    """
+    Synthesized speech marks, parsed line by line as they are received from API,
+    so consumers (e.g. captions or lip sync) can start before the whole response is received,
+    and memory used doesn't depend on number of marks.
+
+    Usage:
+        async with await polly.stream_speech_marks(text, speech_mark_types=['word']) as stream:
+            async for mark in stream:
+                captions.show(mark.value)
+    """
+
+    __slots__ = 'response', 'request_characters', 'trusted', 'params'
+
+    def __init__(self, response: aiohttp.ClientResponse, request_characters: int, trusted: bool = False, **params):
+        """
+        :param trusted: indicates whether marks are created without validation
+        :param params: params of synthesis request
+        """
+        self.response = response
+        self.request_characters = request_characters
+        self.trusted = trusted
+        self.params = params
+
+    async def iter_batches(self) -> AsyncIterator[List[bytes]]:
+        """
+        Yields complete lines received with each network chunk,
+        a line split between chunks is yielded with the chunk it ends in
+        """
+        try:
+            tail = b''
+            async for chunk in self.response.content.iter_any():
+                lines = (tail + chunk if tail else chunk).split(b'\n')
+                tail = lines.pop()
+                lines = [line for line in lines if line.strip()]
+                if lines:
+                    yield lines
+            if tail.strip():
+                yield [tail]
+        finally:
+            self.close()
+
+    async def iter_dicts(self) -> AsyncIterator[dict]:
+        async for lines in self.iter_batches():
+            for mark in json.loads_lines(b'\n'.join(lines)):
+                yield mark
+
+    async def iter_marks(self) -> AsyncIterator[SpeechMarks]:
+        make_mark = SpeechMarks.construct_trusted if self.trusted else SpeechMarks.parse_obj
+        async for mark in self.iter_dicts():
+            yield make_mark(mark)
+
+    async def to_table(self) -> SpeechMarksTable:
+        """
+        Reads the rest of the marks into SpeechMarksTable
+        """
+        table = SpeechMarksTable()
+        async for lines in self.iter_batches():
+            table.extend(json.loads_lines(b'\n'.join(lines)))
+        return table
+
+    @property
+    def closed(self) -> bool:
+        return self.response.closed
+
+    def close(self):
+        self.response.release()
+
+    def __aiter__(self):
+        return self.iter_marks()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.close()
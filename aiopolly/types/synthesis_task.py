@@ -8,6 +8,8 @@ __all__ = ['SynthesisTask', 'SynthesisTasksList']
 
 
 class SynthesisTask(BasePollyObject):
+    __hash_fields__ = ('task_id',)
+
     creation_time: datetime.datetime
     language_code: str
     lexicon_names: List[str]
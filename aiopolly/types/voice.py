@@ -9,6 +9,8 @@ __all__ = ['Voice', 'VoicesList']
 
 
 class Voice(BasePollyObject):
+    __hash_fields__ = ('id',)
+
     additional_language_codes: List[str] = None
     gender: Gender
     id: VoiceID
@@ -0,0 +1,12 @@
+from .base import BaseCache, CacheStats
+from .memory_cache import MemoryCache
+
+__all__ = ['BaseCache', 'CacheStats', 'DiskCache', 'MemoryCache']
+
+
+def __getattr__(name: str):
+    # DiskCache requires aiofiles, so it's imported on first access
+    if name == 'DiskCache':
+        from .disk_cache import DiskCache
+        return DiskCache
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
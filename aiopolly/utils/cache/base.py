@@ -0,0 +1,66 @@
+import abc
+from typing import Optional
+
+from ...types import Speech
+
+__all__ = ['BaseCache', 'CacheStats', 'copy_speech']
+
+
+def copy_speech(speech: Speech) -> Speech:
+    """
+    Returns speech with its own fields, so assignments to the copy (e.g. by converter) don't change the original.
+    pydantic copy() without arguments shares __dict__ with the original, update={} builds a new one
+    """
+    if isinstance(speech, Speech):
+        return speech.copy(update={})
+    return speech.copy()
+
+
+class CacheStats:
+    __slots__ = 'hits', 'misses', 'evictions'
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self):
+        return f'<CacheStats hits={self.hits} misses={self.misses} evictions={self.evictions}>'
+
+
+class BaseCache(abc.ABC):
+    """
+    Stores synthesized speech by request key (see aiopolly.utils.payload.get_request_key),
+    so Polly.synthesize_speech can return it without sending request to API
+    """
+
+    stats: CacheStats
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Optional[Speech]:
+        """
+        :param key: request key
+        :return: new Speech instance or None if key is not cached
+        """
+        pass
+
+    @abc.abstractmethod
+    async def set(self, key: str, speech: Speech):
+        """
+        :param key: request key
+        :param speech: speech to store, it must not be changed by cache
+        """
+        pass
+
+    @abc.abstractmethod
+    async def delete(self, key: str):
+        pass
+
+    @abc.abstractmethod
+    async def clear(self):
+        pass
@@ -0,0 +1,205 @@
+import asyncio
+import functools
+import logging
+import os
+import struct
+import uuid
+from collections import OrderedDict
+from typing import Optional, Type, Union
+
+import aiofiles
+
+from .base import BaseCache, CacheStats
+from ...types import CompactSpeech, Speech
+from .. import json
+
+__all__ = ['DiskCache']
+
+log = logging.getLogger('aiopolly')
+
+EXTENSION = '.speech'
+TMP_EXTENSION = '.tmp'
+HEADER = struct.Struct('>I')
+
+CONVERTED_IS_AUDIO = 'audio'
+CONVERTED_IS_SEPARATE = 'separate'
+
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024  # 512 MiB
+
+
+class DiskCache(BaseCache):
+    """
+    Stores each speech in a separate file named by its request key
+    and evicts least recently used files when total size exceeds max_size.
+
+    Entries are persistent: cache directory is scanned on first use, file modification time is used as last access time.
+
+    File layout: 4-byte big-endian length of JSON metadata, metadata, audio stream, converted stream (if differs).
+    """
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE,
+                 speech_class: Type[Union[Speech, CompactSpeech]] = Speech):
+        """
+        :param directory: path to directory where speech files are stored, will be created if doesn't exist
+        :param max_size: total size of stored files in bytes
+        :param speech_class: class of returned speech, CompactSpeech gets audio as memoryview of file contents
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.speech_class = speech_class
+        self.stats = CacheStats()
+
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._size = 0
+        self._loaded = False
+        self._load_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: str):
+        return key in self._entries
+
+    async def get(self, key: str) -> Optional[Speech]:
+        await self._ensure_loaded()
+
+        if key not in self._entries:
+            self.stats.misses += 1
+            return None
+
+        path = self._get_path(key)
+        try:
+            async with aiofiles.open(path, mode='rb') as file:
+                data = await file.read()
+            speech = self._load_speech(data)
+        except (OSError, ValueError, struct.error) as e:
+            log.warning('Unable to read cached speech %s: %r', path, e)
+            await self._remove(key)
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        await self._run(os.utime, path, None)
+
+        self.stats.hits += 1
+        return speech
+
+    async def set(self, key: str, speech: Speech):
+        await self._ensure_loaded()
+
+        data = self._dump_speech(speech)
+        if len(data) > self.max_size:
+            return
+
+        path = self._get_path(key)
+        tmp_path = f'{path}.{uuid.uuid4().hex}{TMP_EXTENSION}'
+        async with aiofiles.open(tmp_path, mode='wb') as file:
+            await file.write(data)
+        await self._run(os.replace, tmp_path, path)
+
+        self._size += len(data) - self._entries.pop(key, 0)
+        self._entries[key] = len(data)
+
+        await self._evict()
+
+    async def delete(self, key: str):
+        await self._ensure_loaded()
+        await self._remove(key)
+
+    async def clear(self):
+        await self._ensure_loaded()
+        for key in list(self._entries):
+            await self._remove(key)
+
+    async def _evict(self):
+        while self._size > self.max_size and self._entries:
+            key = next(iter(self._entries))
+            await self._remove(key)
+            self.stats.evictions += 1
+
+    async def _remove(self, key: str):
+        self._size -= self._entries.pop(key, 0)
+        try:
+            await self._run(os.remove, self._get_path(key))
+        except FileNotFoundError:
+            pass
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+
+        if self._load_lock is None:
+            self._load_lock = asyncio.Lock()
+
+        async with self._load_lock:
+            if not self._loaded:
+                entries = await self._run(self._scan)
+                self._entries = OrderedDict((key, size) for key, size, _ in sorted(entries, key=lambda e: e[2]))
+                self._size = sum(self._entries.values())
+                self._loaded = True
+                await self._evict()
+
+    def _scan(self):
+        os.makedirs(self.directory, exist_ok=True)
+
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(TMP_EXTENSION):  # Leftovers of interrupted writes
+                os.remove(entry.path)
+            elif entry.name.endswith(EXTENSION):
+                stat = entry.stat()
+                entries.append((entry.name[:-len(EXTENSION)], stat.st_size, stat.st_mtime))
+        return entries
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + EXTENSION)
+
+    @staticmethod
+    def _dump_speech(speech: Speech) -> bytes:
+        metadata = speech.dict(exclude={'audio_stream', 'converted_stream'})
+        converted_stream = speech.converted_stream
+        if converted_stream is None:
+            metadata['converted_stream'] = None
+            converted_stream = b''
+        elif converted_stream == speech.audio_stream:
+            metadata['converted_stream'] = CONVERTED_IS_AUDIO  # No need to store same stream twice
+            converted_stream = b''
+        else:
+            metadata['converted_stream'] = CONVERTED_IS_SEPARATE
+        metadata['audio_stream_length'] = len(speech.audio_stream)
+
+        metadata = json.dumps(metadata).encode()
+
+        return b''.join((HEADER.pack(len(metadata)), metadata, speech.audio_stream, converted_stream))
+
+    def _load_speech(self, data: bytes) -> Union[Speech, CompactSpeech]:
+        metadata_end = HEADER.size + HEADER.unpack_from(data)[0]
+        metadata = json.loads(data[HEADER.size:metadata_end])
+
+        speech_class = self.speech_class
+        if issubclass(speech_class, CompactSpeech):
+            data = memoryview(data)  # Slicing without copying
+
+        audio_end = metadata_end + metadata.pop('audio_stream_length')
+        audio_stream = data[metadata_end:audio_end]
+
+        converted_stream_mode = metadata.pop('converted_stream')
+        if converted_stream_mode == CONVERTED_IS_AUDIO:
+            converted_stream = audio_stream
+        elif converted_stream_mode == CONVERTED_IS_SEPARATE:
+            converted_stream = data[audio_end:]
+        else:
+            converted_stream = None
+
+        return speech_class(**metadata, audio_stream=audio_stream, converted_stream=converted_stream)
+
+    @staticmethod
+    async def _run(func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args))
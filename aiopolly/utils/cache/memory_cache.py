@@ -0,0 +1,129 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .base import BaseCache, CacheStats, copy_speech
+from ...types import Speech
+
+__all__ = ['MemoryCache']
+
+DEFAULT_MAX_SIZE = 32 * 1024 * 1024  # 32 MiB
+
+
+class MemoryCache(BaseCache):
+    """
+    Keeps speech in process memory and evicts least recently used entries when total size of audio exceeds max_size.
+
+    Can be used in front of another cache (e.g. DiskCache) as a tier for the most requested speech:
+        - entries missing in memory are looked up in the lower tier and promoted on hit,
+        - new entries are written to both tiers (write_through=True),
+          or only to memory and demoted to the lower tier on eviction (write_through=False).
+
+    Usage:
+        cache = MemoryCache(max_size=16 * 1024 * 1024, ttl=3600, lower_tier=DiskCache('speech_cache'))
+        polly = Polly(cache=cache)
+    """
+
+    def __init__(self,
+                 max_size: int = DEFAULT_MAX_SIZE,
+                 ttl: float = None,
+                 lower_tier: BaseCache = None,
+                 write_through: bool = True):
+        """
+        :param max_size: total size of stored audio in bytes
+        :param ttl: seconds after which entry is expired, None means entries don't expire
+        :param lower_tier: cache which is used on miss and receives demoted entries
+        :param write_through: indicates whether new entries are written to the lower tier immediately
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lower_tier = lower_tier
+        self.write_through = write_through
+        self.stats = CacheStats()
+
+        self._entries: 'OrderedDict[str, Tuple[Speech, int, Optional[float], bool]]' = OrderedDict()
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key: str):
+        return key in self._entries
+
+    async def get(self, key: str) -> Optional[Speech]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            speech, _, expires_at, _ = entry
+            if expires_at is None or expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return copy_speech(speech)
+
+            self._pop(key)
+
+        self.stats.misses += 1
+
+        if self.lower_tier is None:
+            return None
+
+        speech = await self.lower_tier.get(key)
+        if speech is not None:
+            # Stored entry is a copy, so changes of returned speech don't reach it
+            await self._put(key, speech, dirty=False)
+        return speech
+
+    async def set(self, key: str, speech: Speech):
+        if self.lower_tier is not None and self.write_through:
+            await self.lower_tier.set(key, speech)
+        await self._put(key, speech, dirty=self.lower_tier is not None and not self.write_through)
+
+    async def delete(self, key: str):
+        self._pop(key)
+        if self.lower_tier is not None:
+            await self.lower_tier.delete(key)
+
+    async def clear(self):
+        self._entries.clear()
+        self._size = 0
+        if self.lower_tier is not None:
+            await self.lower_tier.clear()
+
+    async def _put(self, key: str, speech: Speech, dirty: bool):
+        """
+        :param dirty: indicates whether entry is missing in the lower tier and must be demoted on eviction
+        """
+        size = len(speech.audio_stream)
+        if speech.converted_stream is not None and speech.converted_stream is not speech.audio_stream:
+            size += len(speech.converted_stream)
+
+        self._pop(key)
+
+        if size > self.max_size:
+            if dirty:
+                await self.lower_tier.set(key, speech)
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = copy_speech(speech), size, expires_at, dirty
+        self._size += size
+
+        while self._size > self.max_size:
+            evicted_key, (evicted_speech, _, evicted_expires_at, evicted_dirty) = self._pop_oldest()
+            self.stats.evictions += 1
+            if evicted_dirty and (evicted_expires_at is None or evicted_expires_at > time.monotonic()):
+                await self.lower_tier.set(evicted_key, evicted_speech)
+
+    def _pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+        return entry
+
+    def _pop_oldest(self):
+        key, entry = self._entries.popitem(last=False)
+        self._size -= entry[1]
+        return key, entry
@@ -2,11 +2,18 @@ import functools
 import re
 from typing import Union, Callable, Any
 
+# Keys of API requests and responses are few, so all of them fit in the cache
+KEY_CACHE_SIZE = 1024
 
+_UPPER_CASE = re.compile('([A-Z]+)')
+
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
 def string_to_camel(string: str):
     return ''.join(x[:1].upper() + x[1:] for x in string.split('_'))
 
 
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
 def string_to_lower_camel(string: str):
     in_camel = string_to_camel(string)
     if len(in_camel) > 1:
@@ -15,8 +22,9 @@ def string_to_lower_camel(string: str):
         return in_camel.lower()
 
 
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
 def string_to_snake(string: str):
-    result = re.sub('([A-Z]+)', r'_\1', string).lower()
+    result = _UPPER_CASE.sub(r'_\1', string).lower()
     if result.startswith('_'):
         return result[1:]
     return result
@@ -31,22 +39,38 @@ def to_case(
     if isinstance(obj, str):
         return obj if ignore_string else str_converter(obj)
     elif isinstance(obj, dict):
-        return {
-            str_converter(key):
-            to_case(value, ignore_string=True, any_type=True, str_converter=str_converter)
-            for key, value in obj.items()
-        }
+        return _dict_to_case(obj, str_converter)
     elif isinstance(obj, list):
-        return [
-            to_case(element, ignore_string=True, any_type=True, str_converter=str_converter)
-            for element in obj
-        ]
+        return _list_to_case(obj, str_converter)
     elif any_type:
         return obj
 
     raise ValueError(f'Unexpected type {type(obj)}. Supported types: str, dict, list')
 
 
+def _dict_to_case(obj: dict, str_converter: Callable) -> dict:
+    result = {}
+    for key, value in obj.items():
+        if isinstance(value, dict):
+            value = _dict_to_case(value, str_converter)
+        elif isinstance(value, list):
+            value = _list_to_case(value, str_converter)
+        result[str_converter(key)] = value
+    return result
+
+
+def _list_to_case(obj: list, str_converter: Callable) -> list:
+    # Lists in API responses (Voices, SynthesisTasks, Lexicons) are lists of dicts with the same keys
+    if obj and all(type(element) is dict for element in obj):
+        return [_dict_to_case(element, str_converter) for element in obj]
+    return [
+        _dict_to_case(element, str_converter) if isinstance(element, dict)
+        else _list_to_case(element, str_converter) if isinstance(element, list)
+        else element
+        for element in obj
+    ]
+
+
 to_snake = functools.partial(to_case, str_converter=string_to_snake)
 to_camel = functools.partial(to_case, str_converter=string_to_camel)
 to_lower_camel = functools.partial(to_case, str_converter=string_to_lower_camel)
@@ -0,0 +1,155 @@
+import asyncio
+import collections
+import logging
+import math
+import time
+from typing import Deque, Optional, Type
+
+from .exceptions import AioHTTPException, LimitExceededException, TooManyRequestsException
+
+__all__ = ['AdaptiveConcurrencyLimiter']
+
+log = logging.getLogger('aiopolly')
+
+THROTTLING_EXCEPTIONS = (TooManyRequestsException, LimitExceededException, asyncio.TimeoutError)
+
+
+class _Slot:
+    __slots__ = 'limiter', 'started_at'
+
+    def __init__(self, limiter: 'AdaptiveConcurrencyLimiter'):
+        self.limiter = limiter
+        self.started_at: Optional[float] = None
+
+    async def __aenter__(self):
+        await self.limiter.acquire()
+        self.started_at = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException], exc_tb):
+        self.limiter.release(self.started_at, exc_val)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits number of requests in flight, adjusting the limit with AIMD (additive increase, multiplicative decrease):
+        - every successful request increases the limit by increase / limit, i.e. by 'increase' per full window,
+        - throttling (TooManyRequestsException, LimitExceededException) or timeout multiplies it by decrease_factor.
+
+    Limit is decreased at most once per window: only requests started after the last decrease can decrease it again.
+
+    Usage:
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, max_limit=200)
+        polly = Polly(concurrency_limiter=limiter)
+        ...
+        print(limiter.limit, limiter.in_flight, limiter.queue_length, limiter.average_wait_time)
+    """
+
+    def __init__(self,
+                 initial_limit: float = 10,
+                 min_limit: float = 1,
+                 max_limit: float = 1000,
+                 increase: float = 1,
+                 decrease_factor: float = 0.5):
+        """
+        :param initial_limit: number of requests allowed in flight at start
+        :param min_limit: the limit never goes below this value
+        :param max_limit: the limit never goes above this value
+        :param increase: how much the limit grows after 'limit' successful requests
+        :param decrease_factor: the limit is multiplied by this value on throttling
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError('Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit')
+        if not 0 < decrease_factor < 1:
+            raise ValueError(f'decrease_factor must be between 0 and 1, got {decrease_factor}')
+
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+
+        self.in_flight = 0
+        self.waits = 0
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.last_wait_time = 0.0
+
+        self._waiters: Deque[asyncio.Future] = collections.deque()
+        self._last_decrease_at = float('-inf')
+
+    @property
+    def queue_length(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def average_wait_time(self) -> float:
+        return self.total_wait_time / self.waits if self.waits else 0.0
+
+    def slot(self) -> _Slot:
+        """
+        Async context manager which holds one in-flight slot and reports result of request to limiter
+
+        Usage:
+            async with limiter.slot():
+                await send_request()
+        """
+        return _Slot(self)
+
+    async def acquire(self):
+        started_at = time.monotonic()
+
+        if self._waiters or self.in_flight >= self._max_in_flight:
+            future = asyncio.get_event_loop().create_future()
+            self._waiters.append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Slot was already given to this waiter, passing it on
+                    self.in_flight -= 1
+                    self._wake_up()
+                elif future in self._waiters:
+                    self._waiters.remove(future)
+                raise
+        else:
+            self.in_flight += 1
+
+        wait_time = time.monotonic() - started_at
+        self.waits += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+        self.last_wait_time = wait_time
+
+    def release(self, started_at: float = None, exception: BaseException = None):
+        """
+        :param started_at: time.monotonic() when request was started
+        :param exception: exception raised by request, None if request succeeded
+        """
+        self.in_flight -= 1
+
+        if exception is None:
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+        elif self._is_throttling(exception) and (started_at is None or started_at >= self._last_decrease_at):
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self._last_decrease_at = time.monotonic()
+            log.info('Concurrency limit decreased to %.2f after %s', self.limit, exception.__class__.__name__)
+
+        self._wake_up()
+
+    @property
+    def _max_in_flight(self) -> int:
+        return math.floor(self.limit)
+
+    def _wake_up(self):
+        while self._waiters and self.in_flight < self._max_in_flight:
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+    @staticmethod
+    def _is_throttling(exception: BaseException) -> bool:
+        if isinstance(exception, AioHTTPException):
+            return isinstance(exception.cause, asyncio.TimeoutError)
+        return isinstance(exception, THROTTLING_EXCEPTIONS)
@@ -1,2 +1,11 @@
 from .base import BaseConverter
-from .opus_converter import OpusConverter
+
+__all__ = ['BaseConverter', 'OpusConverter']
+
+
+def __getattr__(name: str):
+    # Converters are imported on first access, so they don't slow down import of aiopolly
+    if name == 'OpusConverter':
+        from .opus_converter import OpusConverter
+        return OpusConverter
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
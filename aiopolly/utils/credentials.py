@@ -1,9 +1,196 @@
-from botocore.credentials import Credentials
-from botocore.session import Session
+import asyncio
+import datetime
+import logging
+from typing import NamedTuple, Optional
+
+__all__ = ['get_credentials', 'CredentialsProvider', 'ReadOnlyCredentials']
+
+log = logging.getLogger('aiopolly')
+
+REFRESH_MARGIN = 15 * 60  # Same as advisory refresh timeout of botocore
+MANDATORY_REFRESH_MARGIN = 60
+REFRESH_RETRY_DELAY = 10
+
+
+class ReadOnlyCredentials(NamedTuple):
+    access_key: str
+    secret_key: str
+    token: Optional[str] = None
 
 
 def get_credentials(access_key: str = None, secret_key: str = None, ):
+    """
+    :rtype: botocore.credentials.Credentials
+    """
+    # botocore takes a while to import, so it's imported only when credentials need to be resolved
+    from botocore.credentials import Credentials
+    from botocore.session import Session
+
     if access_key and secret_key:
         return Credentials(access_key, secret_key)
 
     return Session().get_credentials()
+
+
+class CredentialsProvider:
+    """
+    Resolves credentials in executor, so reading credential files or calling metadata endpoints
+    never blocks the event loop.
+
+    Temporary credentials (STS, instance and container roles) are refreshed in background
+    refresh_margin seconds before they expire, requests keep using the current credentials meanwhile.
+    Requests wait for refresh only if credentials expire in less than MANDATORY_REFRESH_MARGIN seconds.
+
+    Credentials are stored as a single immutable snapshot (ReadOnlyCredentials),
+    so signer never sees access key of one snapshot and secret key of another.
+
+    Usage:
+        provider = CredentialsProvider()
+        credentials = await provider.load()
+        signer = SigV4Signer(provider, region='eu-central-1', service='polly')
+    """
+
+    def __init__(self, access_key: str = None, secret_key: str = None, refresh_margin: float = REFRESH_MARGIN):
+        """
+        :param access_key: AWS access key, if not specified, credentials are resolved by botocore
+        :param secret_key: AWS secret key
+        :param refresh_margin: seconds before expiration when credentials are refreshed in background
+        """
+        self.refresh_margin = refresh_margin
+
+        self._credentials = None  # botocore.credentials.Credentials, None for explicitly passed keys
+        self._frozen: Optional[ReadOnlyCredentials] = None
+        self._expiry_time: Optional[datetime.datetime] = None
+
+        self._access_key = access_key
+        self._secret_key = secret_key
+        if access_key and secret_key:
+            self._frozen = ReadOnlyCredentials(access_key, secret_key)
+
+        self._loading: Optional[asyncio.Future] = None
+        self._refresh_handle: Optional[asyncio.TimerHandle] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._frozen is not None
+
+    @property
+    def expiry_time(self) -> Optional[datetime.datetime]:
+        """
+        Expiration time of current credentials, None for credentials which don't expire
+        """
+        return self._expiry_time
+
+    def get_frozen_credentials(self) -> ReadOnlyCredentials:
+        """
+        Returns current credentials without any IO, credentials must be loaded with load() first
+        """
+        if self._frozen is None:
+            raise RuntimeError('Credentials are not loaded yet, use "await provider.load()" first')
+        return self._frozen
+
+    async def load(self) -> ReadOnlyCredentials:
+        """
+        Returns current credentials, loading them first if they aren't loaded or are about to expire
+        """
+        if self._frozen is not None and not self._expires_in(MANDATORY_REFRESH_MARGIN):
+            return self._frozen
+
+        await self._refresh()
+        return self._frozen
+
+    def close(self):
+        """
+        Stops background refresh and cancels loading in progress, no refresh is scheduled after that
+        """
+        self._closed = True
+        self._cancel_refresh_handle()
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self._loading is not None:
+            self._loading.cancel()
+            # Done callback runs later, load() called meanwhile must not wait for the cancelled loading
+            self._loading = None
+
+    async def _refresh(self):
+        # Concurrent callers share one refresh
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load_in_executor())
+            self._loading.add_done_callback(self._forget_loading)
+        await asyncio.shield(self._loading)
+
+    def _forget_loading(self, future: asyncio.Future):
+        if self._loading is future:
+            self._loading = None
+        if not future.cancelled():
+            # Loading is awaited through shield(), if all callers are cancelled, nobody else retrieves its exception
+            future.exception()
+
+    async def _load_in_executor(self):
+        loop = asyncio.get_event_loop()
+        credentials = self._credentials
+        if credentials is None:
+            credentials = await loop.run_in_executor(None, get_credentials, self._access_key, self._secret_key)
+            if credentials is None:
+                from botocore.exceptions import NoCredentialsError
+                raise NoCredentialsError()
+
+        # Refreshable credentials are refreshed by botocore inside get_frozen_credentials() when needed
+        frozen = await loop.run_in_executor(None, credentials.get_frozen_credentials)
+        self._set_credentials(credentials, ReadOnlyCredentials(*frozen))
+
+    def _set_credentials(self, credentials, frozen: ReadOnlyCredentials):
+        """
+        :param credentials: botocore.credentials.Credentials
+        """
+        self._credentials = credentials
+        # Swapping the whole snapshot at once
+        self._frozen = frozen
+        # botocore doesn't provide public API for expiration time
+        self._expiry_time = getattr(credentials, '_expiry_time', None)
+
+        if self._expiry_time is not None:
+            log.debug('Credentials are loaded, they expire at %s', self._expiry_time)
+            self._schedule_refresh(self._seconds_left() - self.refresh_margin)
+
+    def _schedule_refresh(self, delay: float):
+        if self._closed:
+            return
+        # Called from the refresh task itself, so only the timer is replaced
+        self._cancel_refresh_handle()
+        self._refresh_handle = asyncio.get_event_loop().call_later(
+            max(delay, REFRESH_RETRY_DELAY), self._start_background_refresh
+        )
+
+    def _cancel_refresh_handle(self):
+        if self._refresh_handle is not None:
+            self._refresh_handle.cancel()
+            self._refresh_handle = None
+
+    def _start_background_refresh(self):
+        self._refresh_handle = None
+        # Event loop keeps only weak references to tasks, the reference also lets close() cancel the refresh
+        self._refresh_task = asyncio.ensure_future(self._background_refresh())
+        self._refresh_task.add_done_callback(self._forget_refresh_task)
+
+    def _forget_refresh_task(self, task: asyncio.Task):
+        if self._refresh_task is task:
+            self._refresh_task = None
+
+    async def _background_refresh(self):
+        try:
+            await self._refresh()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning('Unable to refresh credentials, retrying in %d seconds: %r', REFRESH_RETRY_DELAY, e)
+            self._schedule_refresh(REFRESH_RETRY_DELAY)
+
+    def _seconds_left(self) -> float:
+        return (self._expiry_time - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+
+    def _expires_in(self, seconds: float) -> bool:
+        return self._expiry_time is not None and self._seconds_left() < seconds
@@ -87,7 +87,12 @@ class LimitExceededException(PollyAPIException):
 
 class TooManyRequestsException(PollyAPIException):
     http_code = 429
-    retry = False
+    retry = True
+
+
+class ThrottlingException(TooManyRequestsException):
+    msg = 'Rate exceeded'
+    http_code = 400
 
 
 class ServiceFailureException(PollyAPIException):
@@ -49,3 +49,10 @@ else:
 
     def loads(data, **kwargs):
         return json.loads(data, **kwargs)
+
+
+def loads_lines(data: bytes) -> list:
+    """
+    Parses newline delimited JSON (e.g. speech marks) with a single loads call
+    """
+    return loads(b'[' + b','.join(line for line in data.split(b'\n') if line.strip()) + b']')
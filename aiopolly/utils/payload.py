@@ -1,3 +1,6 @@
+import hashlib
+
+from . import json
 from .case import string_to_camel
 
 DEFAULT_EXCLUDE = {'self', 'cls'}
@@ -33,3 +36,14 @@ def generate_params(defaults: dict = None, exclude: set = None, use_camel=True,
         params[string_to_camel(key) if use_camel else key] = value
 
     return params
+
+
+def get_request_key(payload: dict, **extra) -> str:
+    """
+    Returns a stable hash of request payload (and any extra params affecting result, e.g. converter params),
+    which can be used to identify equal requests
+
+    Usage: key = get_request_key(payload, auto_convert=True, **converter_params)
+    """
+    data = json.dumps({'payload': payload, 'extra': extra}, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
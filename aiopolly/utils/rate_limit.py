@@ -0,0 +1,93 @@
+import asyncio
+import time
+from typing import Optional
+
+__all__ = ['RateLimiter', 'TokenBucket']
+
+
+class TokenBucket:
+    """
+    Token bucket which is refilled with 'rate' tokens per second up to 'capacity' tokens.
+
+    When there's not enough tokens, they are borrowed from the future and the caller sleeps until they're refilled,
+    so waiters are served in order of arrival and the long-term rate never exceeds 'rate'.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        :param rate: tokens per second
+        :param capacity: max number of tokens which can be spent at once (burst), default is 'rate'
+        """
+        if rate <= 0:
+            raise ValueError(f'rate must be positive, got {rate}')
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    async def acquire(self, tokens: float = 1):
+        """
+        Waits until requested number of tokens is available and takes them
+        """
+        self._refill()
+        self._tokens -= tokens
+        if self._tokens >= 0:
+            return
+
+        try:
+            await asyncio.sleep(-self._tokens / self.rate)
+        except asyncio.CancelledError:
+            self._tokens += tokens
+            raise
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+class RateLimiter:
+    """
+    Limits requests per second and synthesized characters per second on the client side,
+    so requests wait for quota instead of being rejected by API with TooManyRequestsException.
+
+    Usage:
+        polly = Polly(rate_limits={
+            Polly.methods.SynthesizeSpeech: RateLimiter(requests_per_second=80, characters_per_second=10000),
+            'DescribeVoices': RateLimiter(requests_per_second=10),
+        })
+    """
+
+    def __init__(self,
+                 requests_per_second: float = None,
+                 characters_per_second: float = None,
+                 requests_burst: float = None,
+                 characters_burst: float = None):
+        """
+        :param requests_per_second: max rate of requests
+        :param characters_per_second: max rate of characters sent in request text
+        :param requests_burst: max number of requests sent at once, default is requests_per_second
+        :param characters_burst: max number of characters sent at once, default is characters_per_second
+        """
+        self.requests: Optional[TokenBucket] = None
+        self.characters: Optional[TokenBucket] = None
+
+        if requests_per_second is not None:
+            self.requests = TokenBucket(requests_per_second, requests_burst)
+        if characters_per_second is not None:
+            self.characters = TokenBucket(characters_per_second, characters_burst)
+
+    async def acquire(self, characters: int = 0):
+        """
+        Waits until a request with given number of characters can be sent
+        """
+        if self.requests is not None:
+            await self.requests.acquire()
+        if self.characters is not None and characters:
+            await self.characters.acquire(characters)
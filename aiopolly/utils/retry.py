@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+import aiohttp
+
+from .exceptions import AioHTTPException, TooManyRequestsException
+from ..types.method import Method
+
+__all__ = ['RetryPolicy']
+
+log = logging.getLogger('aiopolly')
+
+T = TypeVar('T')
+
+RETRY_AFTER_HEADER = 'Retry-After'
+
+# Those are rejected before being processed, so it's safe to retry them even for non-idempotent methods
+THROTTLING_EXCEPTIONS = (TooManyRequestsException,)
+
+
+class RetryPolicy:
+    """
+    Retries failed requests with exponential backoff and full jitter:
+    delay before n-th retry is a random value between 0 and min(max_delay, base_delay * 2 ** n).
+
+    Only exceptions marked with 'retry' attribute (throttling and 5xx API errors) and connection errors are retried.
+    Requests to non-idempotent methods (e.g. StartSpeechSynthesisTask) are retried only when throttled.
+
+    Usage:
+        polly = Polly(retry_policy=RetryPolicy(max_attempts=5, max_total_time=10))
+
+        # Disabling retries
+        polly = Polly(retry_policy=RetryPolicy(max_attempts=1))
+    """
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 base_delay: float = 0.1,
+                 max_delay: float = 5,
+                 max_total_time: float = 20,
+                 respect_retry_after: bool = True):
+        """
+        :param max_attempts: max number of attempts, including the first one
+        :param base_delay: seconds, upper bound of delay before the first retry
+        :param max_delay: seconds, upper bound of delay before any retry
+        :param max_total_time: seconds, no retries will be made when this time passed since the first attempt
+        :param respect_retry_after: indicates whether to wait at least as long as Retry-After header says
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_total_time = max_total_time
+        self.respect_retry_after = respect_retry_after
+
+    def is_retryable(self, exception: BaseException, method: Method) -> bool:
+        if isinstance(exception, THROTTLING_EXCEPTIONS):
+            return True
+        if not method.idempotent:
+            return False
+        if isinstance(exception, AioHTTPException):
+            return isinstance(exception.cause, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+        if isinstance(exception, asyncio.TimeoutError):
+            return True
+        return getattr(exception, 'retry', False)
+
+    def get_delay(self, attempt: int, exception: BaseException = None) -> float:
+        """
+        :param attempt: number of failed attempts, starting with 1
+        :param exception: exception raised by the last attempt
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+        if self.respect_retry_after and exception is not None:
+            retry_after = self._get_retry_after(exception)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+
+        return delay
+
+    async def run(self, method: Method, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """
+        Awaits func(*args, **kwargs) until it succeeds or retries are exhausted
+        """
+        deadline = time.monotonic() + self.max_total_time
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_attempts or not self.is_retryable(e, method):
+                    raise
+
+                delay = self.get_delay(attempt, e)
+                if time.monotonic() + delay > deadline:
+                    raise
+
+                log.info('Retrying %s in %.3f seconds (attempt %d of %d) after %s',
+                         method.name, delay, attempt + 1, self.max_attempts, e.__class__.__name__)
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _get_retry_after(exception: BaseException) -> Optional[float]:
+        response = getattr(exception, 'response', None)
+        if response is None:
+            return None
+        try:
+            return max(float(response.headers[RETRY_AFTER_HEADER]), 0)
+        except (KeyError, ValueError):  # Missing header or HTTP-date value
+            return None
@@ -0,0 +1,129 @@
+import datetime
+import hashlib
+import hmac
+from typing import Dict, Optional, Tuple
+from urllib.parse import SplitResult, quote, urlsplit
+
+__all__ = ['SigV4Signer']
+
+ALGORITHM = 'AWS4-HMAC-SHA256'
+TIMESTAMP_FORMAT = '%Y%m%dT%H%M%SZ'
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _hmac(key: bytes, msg: str) -> bytes:
+    return hmac.new(key, msg.encode(), hashlib.sha256).digest()
+
+
+class SigV4Signer:
+    """
+    AWS Signature Version 4 signer for requests made by AmazonAPIClient.
+
+    Unlike botocore SigV4Auth, it signs only the headers client actually sends (host, x-amz-date
+    and x-amz-security-token if credentials have a token), and caches signing key,
+    which is derived only once per day for given credentials, region and service.
+    Produced headers are the same as produced by botocore for the same request and time.
+
+    Usage:
+        signer = SigV4Signer(credentials, region='eu-central-1', service='polly')
+        headers = signer.sign('POST', 'https://polly.eu-central-1.amazonaws.com/v1/speech', payload_json)
+    """
+
+    __slots__ = 'credentials', 'region', 'service', '_signing_key'
+
+    def __init__(self, credentials, region: str, service: str):
+        """
+        :param credentials: botocore.credentials.Credentials or any object with access_key, secret_key and token
+        :param region: AWS region name
+        :param service: AWS service name
+        """
+        self.credentials = credentials
+        self.region = region
+        self.service = service
+
+        self._signing_key: Tuple[Optional[str], Optional[str], bytes] = (None, None, b'')
+
+    def sign(self, request_method: str, url: str, payload: Optional[str] = None,
+             now: datetime.datetime = None) -> Dict[str, str]:
+        """
+        :param request_method: HTTP method
+        :param url: full url, query string (if any) must be already encoded
+        :param payload: request body
+        :param now: time of signing in UTC, current time by default
+        :return: headers to send with request
+        """
+        credentials = self.credentials
+        if credentials is None:
+            raise RuntimeError('Unable to sign request without credentials')
+        if hasattr(credentials, 'get_frozen_credentials'):
+            # Reading access key, secret key and token from one snapshot, so they always match
+            credentials = credentials.get_frozen_credentials()
+
+        timestamp = (now or datetime.datetime.utcnow()).strftime(TIMESTAMP_FORMAT)
+        date = timestamp[:8]
+
+        parts = urlsplit(url)
+
+        headers = {'X-Amz-Date': timestamp}
+        if credentials.token:
+            headers['X-Amz-Security-Token'] = credentials.token
+            signed_headers = 'host;x-amz-date;x-amz-security-token'
+            canonical_headers = f'host:{self._host(parts)}\nx-amz-date:{timestamp}\n' \
+                                f'x-amz-security-token:{" ".join(credentials.token.split())}\n'
+        else:
+            signed_headers = 'host;x-amz-date'
+            canonical_headers = f'host:{self._host(parts)}\nx-amz-date:{timestamp}\n'
+
+        payload_hash = hashlib.sha256(payload.encode() if payload else b'').hexdigest()
+        canonical_request = '\n'.join((
+            request_method.upper(),
+            quote(parts.path or '/', safe='/~'),
+            self._canonical_query_string(parts.query),
+            canonical_headers,
+            signed_headers,
+            payload_hash,
+        ))
+
+        scope = f'{date}/{self.region}/{self.service}/aws4_request'
+        string_to_sign = '\n'.join((
+            ALGORITHM,
+            timestamp,
+            scope,
+            hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ))
+        signature = hmac.new(
+            self._get_signing_key(date, credentials.secret_key), string_to_sign.encode(), hashlib.sha256
+        ).hexdigest()
+
+        headers['Authorization'] = f'{ALGORITHM} Credential={credentials.access_key}/{scope}, ' \
+                                   f'SignedHeaders={signed_headers}, Signature={signature}'
+        return headers
+
+    def _get_signing_key(self, date: str, secret_key: str) -> bytes:
+        cached_date, cached_secret_key, signing_key = self._signing_key
+        if cached_date == date and cached_secret_key == secret_key:
+            return signing_key
+
+        k_date = _hmac(f'AWS4{secret_key}'.encode(), date)
+        k_region = _hmac(k_date, self.region)
+        k_service = _hmac(k_region, self.service)
+        signing_key = _hmac(k_service, 'aws4_request')
+
+        self._signing_key = date, secret_key, signing_key
+        return signing_key
+
+    @staticmethod
+    def _host(parts: SplitResult) -> str:
+        host = parts.hostname
+        if ':' in host:  # IPv6
+            host = f'[{host}]'
+        if parts.port is not None and parts.port != DEFAULT_PORTS.get(parts.scheme):
+            host = f'{host}:{parts.port}'
+        return host
+
+    @staticmethod
+    def _canonical_query_string(query: str) -> str:
+        if not query:
+            return ''
+        pairs = sorted((key, value) for key, _, value in (pair.partition('=') for pair in query.split('&')))
+        return '&'.join(f'{key}={value}' for key, value in pairs)
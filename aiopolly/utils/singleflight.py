@@ -0,0 +1,65 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+__all__ = ['SingleFlight']
+
+T = TypeVar('T')
+
+
+class _Call:
+    __slots__ = 'task', 'waiters'
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls: while a call with some key is in flight,
+    other calls with the same key wait for its result instead of making their own.
+
+    Shared call is cancelled only when all of its waiters are cancelled.
+
+    Usage:
+        single_flight = SingleFlight()
+        results = await asyncio.gather(*(single_flight.do('key', fetch) for _ in range(100)))  # fetch is called once
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def __len__(self):
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable):
+        return key in self._calls
+
+    async def do(self, key: Hashable, func: Callable[..., Awaitable[T]], *args, **kwargs) -> T:
+        """
+        Awaits func(*args, **kwargs) or result of the same call with this key, which is already in flight
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func(*args, **kwargs)))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda task: self._forget(key, call))
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+                # Done callback runs later, callers coming meanwhile must not join the cancelled call
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            call.task.exception()  # Marking exception as retrieved, it's raised to all waiters anyway
@@ -0,0 +1,88 @@
+"""
+Helpers shared by benchmark scripts
+"""
+
+import datetime
+import json
+import math
+import os
+import pathlib
+import platform
+import resource
+import sys
+from typing import List, Optional, Sequence
+
+# Benchmarking the source tree, not installed package
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+import aiopolly  # noqa: E402
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of non-empty values, values don't need to be sorted
+    """
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(values: List[float], scale: float = 1000) -> dict:
+    """
+    :param values: seconds
+    :param scale: multiplier for reported values, milliseconds by default
+    """
+    if not values:
+        return dict.fromkeys(('min', 'mean', 'p50', 'p95', 'p99', 'max'))
+
+    return {
+        'min': min(values) * scale,
+        'mean': sum(values) / len(values) * scale,
+        'p50': percentile(values, 50) * scale,
+        'p95': percentile(values, 95) * scale,
+        'p99': percentile(values, 99) * scale,
+        'max': max(values) * scale,
+    }
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of current process in megabytes
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':  # bytes on macOS, kilobytes elsewhere
+        return peak / 1024 / 1024
+    return peak / 1024
+
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Current resident set size of current process in megabytes, None where /proc is not available
+    """
+    try:
+        with open('/proc/self/statm') as file:
+            resident_pages = int(file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+def environment() -> dict:
+    return {
+        'aiopolly': aiopolly.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def write_results(path: str, results: dict):
+    if path == '-':
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f'Results are written to {path}')
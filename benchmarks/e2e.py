@@ -0,0 +1,255 @@
+"""
+End-to-end throughput and latency benchmark against local FakePollyServer.
+
+Fake server runs in a separate process, so its work doesn't affect measured event loop lag.
+
+Usage:
+    $ python benchmarks/e2e.py --concurrency 1 10 50 --requests 500 --output e2e.json
+    $ python benchmarks/e2e.py --scenarios synthesize_speech --server-latency 0.05 --server-throughput 1048576
+"""
+
+import argparse
+import asyncio
+import os
+import pathlib
+import socket
+import sys
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import aiohttp
+
+from common import current_rss_mb, environment, peak_rss_mb, summarize, write_results
+
+from aiopolly import Polly, types
+from aiopolly.utils.converter import OpusConverter
+from aiopolly.utils.retry import RetryPolicy
+
+TEXTS = [
+    'Hello!',
+    'Your call is important to us. Please stay on the line and one of our operators will answer shortly.',
+    ' '.join(['The quick brown fox jumps over the lazy dog, while the lazy dog keeps sleeping.'] * 20),
+]
+
+LAG_INTERVAL = 0.01
+
+
+class LoopLagMonitor:
+    """
+    Measures how late event loop wakes up a coroutine sleeping for LAG_INTERVAL
+    """
+
+    def __init__(self):
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        while True:
+            started_at = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            self.lags.append(max(loop.time() - started_at - LAG_INTERVAL, 0))
+
+    def __enter__(self):
+        self._task = asyncio.ensure_future(self._run())
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._task.cancel()
+
+
+async def run_scenario(name: str, call: Callable[[int], Awaitable[int]], concurrency: int, requests: int) -> dict:
+    """
+    :param call: coroutine function which receives request number and returns number of synthesized characters
+    """
+    latencies: List[float] = []
+    errors = 0
+    characters = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors, characters
+        for n in counter:
+            started_at = time.perf_counter()
+            try:
+                characters += await call(n)
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - started_at)
+
+    rss_before = current_rss_mb()
+    with LoopLagMonitor() as lag_monitor:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        duration = time.perf_counter() - started_at
+    rss_after = current_rss_mb()
+
+    return {
+        'scenario': name,
+        'concurrency': concurrency,
+        'requests': requests,
+        'errors': errors,
+        'duration_s': duration,
+        'requests_per_s': len(latencies) / duration,
+        'characters_per_s': characters / duration,
+        'latency_ms': summarize(latencies),
+        'loop_lag_ms': summarize(lag_monitor.lags),
+        # Peak RSS is cumulative for the process, so scenarios report change of current RSS instead
+        'rss_delta_mb': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+    }
+
+
+def make_scenarios(polly: Polly, converter: Optional[OpusConverter]) -> dict:
+    async def synthesize_speech(n: int) -> int:
+        speech = await polly.synthesize_speech(TEXTS[n % len(TEXTS)] + f' {n}', auto_convert=False)
+        return speech.request_characters
+
+    async def speech_marks(n: int) -> int:
+        await polly.synthesize_speech(TEXTS[n % len(TEXTS)] + f' {n}',
+                                      output_format=types.AudioFormat.json,
+                                      speech_mark_types=[types.SpeechMarkTypes.word, types.SpeechMarkTypes.sentence])
+        return 0
+
+    async def speech_marks_stream(n: int) -> int:
+        async with await polly.stream_speech_marks(
+                TEXTS[n % len(TEXTS)] + f' {n}',
+                speech_mark_types=[types.SpeechMarkTypes.word, types.SpeechMarkTypes.sentence]
+        ) as stream:
+            async for _ in stream:
+                pass
+        return 0
+
+    async def describe_voices(n: int) -> int:
+        await polly.describe_voices()
+        return 0
+
+    scenarios = {
+        'synthesize_speech': synthesize_speech,
+        'speech_marks': speech_marks,
+        'speech_marks_stream': speech_marks_stream,
+        'describe_voices': describe_voices,
+    }
+
+    if converter is not None:
+        sample = {}
+
+        async def convert(n: int) -> int:
+            if 'speech' not in sample:
+                sample['speech'] = await polly.synthesize_speech(TEXTS[1], auto_convert=False)
+            await converter.convert(sample['speech'].copy(update={}))
+            return sample['speech'].request_characters
+
+        scenarios['opus_convert'] = convert
+
+    return scenarios
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def start_server(args) -> Tuple[asyncio.subprocess.Process, str]:
+    port = get_free_port()
+    command = [sys.executable, '-m', 'aiopolly.testing', '--port', str(port),
+               '--latency', str(args.server_latency),
+               '--throttle-rate', str(args.server_throttle_rate),
+               '--error-rate', str(args.server_error_rate)]
+    if args.server_throughput:
+        command += ['--throughput', str(args.server_throughput)]
+
+    root = str(pathlib.Path(__file__).resolve().parent.parent)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (root, os.environ.get('PYTHONPATH')))))
+    process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.DEVNULL, env=env)
+    url = f'http://127.0.0.1:{port}'
+
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.get(url + '/v1/voices') as response:
+                    await response.read()
+                return process, url
+            except aiohttp.ClientConnectionError:
+                await asyncio.sleep(0.1)
+
+    process.kill()
+    raise RuntimeError('Fake Polly server did not start')
+
+
+async def main(args):
+    converter = None
+    if 'opus_convert' in args.scenarios:
+        try:
+            converter = OpusConverter(auto_convert=False)
+        except RuntimeError as e:
+            print(f'Skipping opus_convert: {e}', file=sys.stderr)
+
+    process = None
+    url = args.server_url
+    if url is None:
+        process, url = await start_server(args)
+
+    polly = Polly(
+        base_url=url,
+        access_key='benchmark',
+        secret_key='benchmark',
+        voice_id=types.VoiceID.Joanna,
+        output_format=types.AudioFormat.mp3,
+        converter=converter,
+        coalesce_requests=False,
+        retry_policy=RetryPolicy(max_attempts=args.max_attempts),
+        connection_limit=max(args.concurrency),
+    )
+
+    results = []
+    try:
+        scenarios = make_scenarios(polly, converter)
+        for name in args.scenarios:
+            if name not in scenarios:
+                continue
+            for concurrency in args.concurrency:
+                # Warming up connections and caches, so they don't affect results
+                await run_scenario(name, scenarios[name], concurrency, min(concurrency, args.requests))
+                result = await run_scenario(name, scenarios[name], concurrency, args.requests)
+                results.append(result)
+                print(f"{name:>18} x{concurrency:<4} {result['requests_per_s']:>9.1f} req/s  "
+                      f"p50 {result['latency_ms']['p50'] or 0:>8.2f} ms  "
+                      f"p99 {result['latency_ms']['p99'] or 0:>8.2f} ms  "
+                      f"lag p99 {result['loop_lag_ms']['p99'] or 0:>7.2f} ms  "
+                      f"errors {result['errors']}", file=sys.stderr)
+    finally:
+        await polly.close()
+        if process is not None:
+            process.terminate()
+            await process.wait()
+
+    write_results(args.output, {
+        'benchmark': 'e2e',
+        'environment': environment(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'peak_rss_mb': peak_rss_mb(),
+        'results': results,
+    })
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', default=[
+        'synthesize_speech', 'speech_marks', 'speech_marks_stream', 'describe_voices', 'opus_convert'
+    ])
+    parser.add_argument('--concurrency', nargs='+', type=int, default=[1, 10, 50])
+    parser.add_argument('--requests', type=int, default=500, help='requests per scenario and concurrency level')
+    parser.add_argument('--max-attempts', type=int, default=1, help='attempts per request, 1 disables retries')
+    parser.add_argument('--server-url', default=None, help='url of already running server')
+    parser.add_argument('--server-latency', type=float, default=0.0)
+    parser.add_argument('--server-throughput', type=float, default=None)
+    parser.add_argument('--server-throttle-rate', type=float, default=0.0)
+    parser.add_argument('--server-error-rate', type=float, default=0.0)
+    parser.add_argument('--output', default='-', help='path to JSON results file, "-" means stdout')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main(parse_args()))
@@ -0,0 +1,115 @@
+"""
+Import time of aiopolly measured with "python -X importtime" in fresh interpreters.
+
+Fails (exits with status 1) when median import time exceeds the budget,
+or when any of the lazily imported modules is imported by "import aiopolly".
+
+Usage:
+    $ python benchmarks/import_time.py --runs 20 --output import_time.json
+    $ python benchmarks/import_time.py --budget-ms 300
+"""
+
+import argparse
+import collections
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+from common import environment, write_results
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+BUDGET_MS = 500
+
+# Heavy dependencies and optional parts which must be imported only on first use
+LAZY_MODULES = [
+    'aiofiles',
+    'botocore',
+    'aiopolly.utils.cache.disk_cache',
+    'aiopolly.utils.converter.opus_converter',
+    'aiopolly.utils.ssml',
+]
+
+CODE = 'import sys, aiopolly; print(",".join(sys.modules))'
+
+
+def measure() -> Tuple[float, Dict[str, float], List[str]]:
+    """
+    :return: import time of aiopolly in ms, self time by top-level package in ms, imported modules
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (str(ROOT), os.environ.get('PYTHONPATH')))))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', CODE],
+                             env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+                             check=True)
+
+    total = None
+    packages = collections.Counter()
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, cumulative, name = (part.strip() for part in line[len('import time:'):].split('|'))
+        packages[name.split('.')[0]] += int(self_time) / 1000
+        if name == 'aiopolly':
+            total = int(cumulative) / 1000
+
+    return total, dict(packages), process.stdout.strip().split(',')
+
+
+def main(args):
+    totals = []
+    packages = collections.defaultdict(list)
+    modules = []
+    for _ in range(args.runs):
+        total, package_times, modules = measure()
+        totals.append(total)
+        for package, package_time in package_times.items():
+            packages[package].append(package_time)
+
+    median = statistics.median(totals)
+    top_packages = sorted(((statistics.median(times), package) for package, times in packages.items()), reverse=True)
+    lazy_imported = [name for name in LAZY_MODULES if name in modules]
+
+    print(f'import aiopolly: median {median:.1f} ms, min {min(totals):.1f} ms, budget {args.budget_ms} ms',
+          file=sys.stderr)
+    for package_time, package in top_packages[:args.top]:
+        print(f'{package:>24} {package_time:>8.1f} ms', file=sys.stderr)
+
+    write_results(args.output, {
+        'benchmark': 'import_time',
+        'environment': environment(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'results': {
+            'median_ms': median,
+            'min_ms': min(totals),
+            'max_ms': max(totals),
+            'packages_ms': {package: package_time for package_time, package in top_packages[:args.top]},
+            'modules_count': len(modules),
+            'lazy_modules_imported': lazy_imported,
+        },
+    })
+
+    failed = False
+    if lazy_imported:
+        print(f'Modules which must be imported lazily are imported by "import aiopolly": {lazy_imported}',
+              file=sys.stderr)
+        failed = True
+    if args.budget_ms and median > args.budget_ms:
+        print(f'Import time {median:.1f} ms exceeds budget of {args.budget_ms} ms', file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS, help='0 disables the check')
+    parser.add_argument('--top', type=int, default=15, help='number of slowest top-level packages to report')
+    parser.add_argument('--output', default='-', help='path to JSON results file, "-" means stdout')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(main(parse_args()))
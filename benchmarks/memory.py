@@ -0,0 +1,121 @@
+"""
+Memory regression check of a long-running synthesis loop against in-process FakePollyServer.
+
+Every synthesized speech is used the way applications use it (clean_text, polly, filename)
+and dropped, so after the loop no speech object must be alive and traced memory must not keep growing.
+
+Fails (exits with status 1) when speech objects outlive the loop,
+or when memory grows by more than the budget between the first and the last checkpoint.
+
+Usage:
+    $ python benchmarks/memory.py --iterations 5000 --output memory.json
+    $ python benchmarks/memory.py --speech-class CompactSpeech --budget-kb 256
+"""
+
+import argparse
+import asyncio
+import gc
+import itertools
+import sys
+import tracemalloc
+from typing import List
+
+from common import environment, write_results
+
+from aiopolly import Polly, types
+from aiopolly.testing import FakePollyServer
+
+BUDGET_KB = 512
+CHECKPOINTS = 5
+
+TEXTS = [
+    'Hello!',
+    '<speak>Your call is <emphasis>important</emphasis> to us. Please stay on the line.</speak>',
+]
+
+
+def count_alive(speech_class: type) -> int:
+    gc.collect()
+    return sum(isinstance(obj, speech_class) for obj in gc.get_objects())
+
+
+async def synthesize(polly: Polly, n: int) -> int:
+    text = TEXTS[n % len(TEXTS)]
+    speech = await polly.synthesize_speech(text.replace('!', f' {n}!').replace('.<', f' {n}.<'),
+                                           text_type='ssml' if text.startswith('<speak>') else 'text')
+    # Touching derived properties, previously cached in class-level lru_cache forever
+    assert speech.clean_text and speech.polly is polly and speech.filename()
+    return len(speech.audio_stream)
+
+
+async def main(args) -> int:
+    speech_class = getattr(types, args.speech_class)
+    iterations_per_checkpoint = max(args.iterations // CHECKPOINTS, 1)
+    checkpoints: List[dict] = []
+
+    async with FakePollyServer() as server:
+        async with Polly(base_url=server.url, access_key='benchmark', secret_key='benchmark',
+                         voice_id=types.VoiceID.Joanna, output_format=types.AudioFormat.mp3,
+                         speech_class=speech_class) as polly:
+            Polly.set_current(polly)
+
+            counter = itertools.count()
+            # Warming up connections, caches and lazy imports, so they don't count as growth
+            for n in itertools.islice(counter, args.warmup):
+                await synthesize(polly, n)
+
+            gc.collect()
+            tracemalloc.start()
+            for checkpoint in range(CHECKPOINTS + 1):
+                if checkpoint:
+                    for n in itertools.islice(counter, iterations_per_checkpoint):
+                        await synthesize(polly, n)
+                gc.collect()
+                current, peak = tracemalloc.get_traced_memory()
+                checkpoints.append({'iterations': checkpoint * iterations_per_checkpoint,
+                                    'traced_kb': current / 1024, 'peak_kb': peak / 1024})
+            tracemalloc.stop()
+
+    alive = count_alive(speech_class)
+    growth_kb = checkpoints[-1]['traced_kb'] - checkpoints[1]['traced_kb']
+
+    for checkpoint in checkpoints:
+        print(f"{checkpoint['iterations']:>8} iterations {checkpoint['traced_kb']:>10.1f} KB traced  "
+              f"(peak {checkpoint['peak_kb']:.1f} KB)", file=sys.stderr)
+    print(f'{speech_class.__name__} objects alive after loop: {alive}, growth {growth_kb:.1f} KB, '
+          f'budget {args.budget_kb} KB', file=sys.stderr)
+
+    write_results(args.output, {
+        'benchmark': 'memory',
+        'environment': environment(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'results': {
+            'checkpoints': checkpoints,
+            'growth_kb': growth_kb,
+            'speech_alive': alive,
+        },
+    })
+
+    failed = False
+    if alive:
+        print(f'{alive} {speech_class.__name__} objects are still referenced after the loop', file=sys.stderr)
+        failed = True
+    if args.budget_kb and growth_kb > args.budget_kb:
+        print(f'Memory grew by {growth_kb:.1f} KB, budget is {args.budget_kb} KB', file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--speech-class', choices=['Speech', 'CompactSpeech'], default='Speech')
+    parser.add_argument('--budget-kb', type=float, default=BUDGET_KB,
+                        help='allowed growth after the first checkpoint, 0 disables the check')
+    parser.add_argument('--output', default='-', help='path to JSON results file, "-" means stdout')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.get_event_loop().run_until_complete(main(parse_args())))
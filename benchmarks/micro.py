@@ -0,0 +1,236 @@
+"""
+Microbenchmarks of CPU work done by client for every request, no network involved.
+
+Each benchmark reports time per call in microseconds (best and mean of repeats),
+so CPU cost per request can be tracked between versions.
+
+Usage:
+    $ python benchmarks/micro.py --output micro.json
+    $ python benchmarks/micro.py --benchmarks signing speech_marks_list --repeat 10
+"""
+
+import argparse
+import asyncio
+import itertools
+import sys
+import timeit
+from typing import Callable, Dict
+
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
+
+from common import environment, write_results
+
+from aiopolly import Polly, types
+from aiopolly.testing import FakePollyServer
+from aiopolly.utils import case, json
+from aiopolly.utils.payload import generate_params, get_request_key
+
+LONG_TEXT = ' '.join(
+    ['Your call is important to us. Please stay on the line and one of our operators will answer shortly.'] * 30
+)[:2990]
+
+SPEECH_MARKS_COUNT = 1000
+VOICES_COUNT = 500
+SYNTHESIS_TASKS_COUNT = 100  # Max number of tasks returned by ListSpeechSynthesisTasks
+
+
+def make_speech_marks_lines() -> bytes:
+    marks = FakePollyServer.generate_speech_marks(
+        LONG_TEXT * 2, [types.SpeechMarkTypes.sentence, types.SpeechMarkTypes.word, types.SpeechMarkTypes.viseme]
+    )
+    return b''.join(json.dumps(mark).encode() + b'\n' for mark in itertools.islice(marks, SPEECH_MARKS_COUNT))
+
+
+def make_voices_response() -> dict:
+    voice_ids = list(types.VoiceID)
+    language_codes = list(types.LanguageCode)
+    voices = []
+    for n in range(VOICES_COUNT):
+        voice = {
+            'Gender': 'Female' if n % 2 else 'Male',
+            'Id': voice_ids[n % len(voice_ids)].value,
+            'LanguageCode': language_codes[n % len(language_codes)].value,
+            'LanguageName': 'US English',
+            'Name': voice_ids[n % len(voice_ids)].value,
+        }
+        if n % 5 == 0:
+            voice['AdditionalLanguageCodes'] = [language_codes[(n + 1) % len(language_codes)].value]
+        voices.append(voice)
+    return {'Voices': voices, 'NextToken': 'token'}
+
+
+def make_synthesis_tasks_response() -> dict:
+    tasks = []
+    for n in range(SYNTHESIS_TASKS_COUNT):
+        tasks.append({
+            'CreationTime': 1577836800.0 + n,
+            'LanguageCode': 'en-US',
+            'LexiconNames': ['first', 'second'],
+            'OutputFormat': 'mp3',
+            'OutputUri': f'https://s3.eu-central-1.amazonaws.com/bucket/{n:036d}.mp3',
+            'RequestCharacters': 2990,
+            'SampleRate': '22050',
+            'SnsTopicArn': 'arn:aws:sns:eu-central-1:000000000000:topic',
+            'SpeechMarkTypes': [],
+            'TaskId': f'{n:036d}',
+            'TaskStatus': 'completed',
+            'TaskStatusReason': '',
+            'TextType': 'text',
+            'VoiceId': 'Joanna',
+        })
+    return {'SynthesisTasks': tasks, 'NextToken': 'token'}
+
+
+def sign_with_botocore(signer: SigV4Auth, request_method: str, url: str, payload: str = None) -> dict:
+    request = AWSRequest(method=request_method, url=url, data=payload)
+    signer.add_auth(request)
+    return dict(request.headers.items())
+
+
+def make_benchmarks(polly: Polly) -> Dict[str, Callable[[], object]]:
+    methods = polly.methods
+    defaults = polly.defaults
+    synthesize_locals = {
+        'self': polly, 'text': LONG_TEXT, 'voice_id': None, 'output_format': None, 'sample_rate': None,
+        'speech_mark_types': None, 'text_type': 'text', 'language_code': None, 'lexicon_names': ['first', 'second'],
+        'auto_convert': None, 'engine': None, 'converter_params': {},
+    }
+    payload = generate_params(**synthesize_locals, defaults=defaults, use_camel=False,
+                              exclude={'auto_convert', 'converter_params'})
+    camel_payload = case.to_camel(payload)
+    schema = methods.SynthesizeSpeech.request_schema
+    payload_json = json.dumps(camel_payload)
+
+    voices_response = make_voices_response()
+    voices_json = json.dumps(voices_response)
+    snake_voices = case.to_snake(voices_response)
+
+    speech_marks_lines = make_speech_marks_lines()
+    speech_marks = [json.loads(line) for line in speech_marks_lines.split(b'\n')[:-1]]
+    speech_marks_table = types.SpeechMarksTable.from_json_lines(speech_marks_lines)
+
+    synthesis_tasks_response = make_synthesis_tasks_response()
+
+    audio_stream = FakePollyServer.generate_audio(LONG_TEXT, types.VoiceID.Joanna, types.AudioFormat.mp3)
+
+    speech = types.Speech(content_type=types.ContentType.audio_mpeg, request_characters='2990',
+                          audio_stream=audio_stream, **payload)
+    equal_speech = types.Speech(content_type=types.ContentType.audio_mpeg, request_characters='2990',
+                                audio_stream=bytes(audio_stream), **payload)
+
+    sign = polly._AmazonAPIClient__get_signed_headers  # The same signing as on every request
+    speech_url = methods.SynthesizeSpeech.get_url(polly.base_url)
+    botocore_signer = SigV4Auth(Credentials('benchmark', 'benchmark'), 'polly', polly.region)
+
+    def make_converted(speech_class):
+        # The same creation and assignments as in synthesize_speech with OpusConverter
+        speech = speech_class(content_type=types.ContentType.audio_mpeg, request_characters='2990',
+                              audio_stream=audio_stream, **payload)
+        speech.audio_stream = audio_stream
+        speech.converted_stream = audio_stream
+        speech.converted = True
+        speech.converted_params = {'to_format': 'ogg_opus', 'duration_in_seconds': 120, 'out_bitrate': 48,
+                                   'out_sample_rate': 24000, 'in_params': '', 'filters': ''}
+        return speech
+
+    return {
+        'generate_params': lambda: generate_params(**synthesize_locals, defaults=defaults, use_camel=False,
+                                                   exclude={'auto_convert', 'converter_params'}),
+        'request_schema': lambda: schema.split(schema.collect(synthesize_locals, defaults=defaults)),
+        'get_request_key': lambda: get_request_key(payload),
+        'to_camel_payload': lambda: case.to_camel(payload),
+        'to_snake_voices': lambda: case.to_snake(voices_response),
+        'to_camel_voices': lambda: case.to_camel(snake_voices),
+        'get_url_endpoint': lambda: methods.SynthesizeSpeech.get_url(polly.base_url),
+        'get_url_template': lambda: methods.GetLexicon.get_url(polly.base_url, {'LexiconName': 'lexicon'}),
+        'get_url_query': lambda: methods.DescribeVoices.get_url(
+            polly.base_url, {'LanguageCode': 'en-US', 'IncludeAdditionalLanguageCodes': 'true', 'NextToken': 'token'}
+        ),
+        'signing': lambda: sign(speech_url, 'POST', payload_json),
+        'signing_botocore': lambda: sign_with_botocore(botocore_signer, 'POST', speech_url, payload_json),
+        'json_dumps_payload': lambda: json.dumps(camel_payload),
+        'json_loads_voices': lambda: json.loads(voices_json),
+        'json_loads_speech_marks': lambda: [json.loads(line) for line in speech_marks_lines.split(b'\n')[:-1]],
+        'speech': lambda: types.Speech(content_type=types.ContentType.audio_mpeg, request_characters='2990',
+                                       audio_stream=audio_stream, **payload),
+        'speech_converted': lambda: make_converted(types.Speech),
+        'compact_speech': lambda: types.CompactSpeech(content_type=types.ContentType.audio_mpeg,
+                                                      request_characters='2990', audio_stream=audio_stream, **payload),
+        'compact_speech_converted': lambda: make_converted(types.CompactSpeech),
+        'speech_hash': lambda: hash(speech),
+        'speech_eq': lambda: speech == equal_speech,
+        'speech_marks_list': lambda: types.SpeechMarksList(speech_marks=speech_marks),
+        'speech_marks_list_trusted': lambda: types.SpeechMarksList.construct_trusted({'speech_marks': speech_marks}),
+        'speech_marks_table': lambda: types.SpeechMarksTable.from_json_lines(speech_marks_lines),
+        'speech_marks_table_mark_at': lambda: speech_marks_table.mark_at(60000, types.SpeechMarkTypes.word),
+        'voices_list': lambda: types.VoicesList(**voices_response),
+        'voices_list_trusted': lambda: types.VoicesList.construct_trusted(voices_response),
+        'synthesis_tasks_list': lambda: types.SynthesisTasksList(**synthesis_tasks_response),
+        'synthesis_tasks_list_trusted': lambda: types.SynthesisTasksList.construct_trusted(synthesis_tasks_response),
+    }
+
+
+def run_benchmark(name: str, func: Callable[[], object], repeat: int, min_time: float) -> dict:
+    timer = timeit.Timer(func)
+
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+
+    timings = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        'benchmark': name,
+        'calls': number * repeat,
+        'best_us': min(timings) * 1e6,
+        'mean_us': sum(timings) / len(timings) * 1e6,
+    }
+
+
+def main(args):
+    loop = asyncio.get_event_loop()
+    polly = Polly(
+        base_url='http://127.0.0.1:8080',
+        access_key='benchmark',
+        secret_key='benchmark',
+        voice_id=types.VoiceID.Joanna,
+        output_format=types.AudioFormat.mp3,
+        loop=loop,
+    )
+
+    results = []
+    try:
+        benchmarks = make_benchmarks(polly)
+        for name in args.benchmarks or benchmarks:
+            result = run_benchmark(name, benchmarks[name], args.repeat, args.min_time)
+            results.append(result)
+            print(f"{name:>28} {result['best_us']:>12.2f} us  (mean {result['mean_us']:.2f} us)", file=sys.stderr)
+    finally:
+        loop.run_until_complete(polly.close())
+
+    write_results(args.output, {
+        'benchmark': 'micro',
+        'environment': environment(),
+        'config': {key: value for key, value in vars(args).items() if key != 'output'},
+        'inputs': {
+            'text_length': len(LONG_TEXT),
+            'speech_marks': SPEECH_MARKS_COUNT,
+            'voices': VOICES_COUNT,
+            'synthesis_tasks': SYNTHESIS_TASKS_COUNT,
+        },
+        'results': results,
+    })
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--benchmarks', nargs='+', default=None, help='names of benchmarks to run, all by default')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds each repeat takes at least')
+    parser.add_argument('--output', default='-', help='path to JSON results file, "-" means stdout')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    main(parse_args())
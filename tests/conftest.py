@@ -0,0 +1,15 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def run():
+    """
+    Runs coroutine in a new event loop, closed after the test
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop.run_until_complete
+    loop.close()
+    asyncio.set_event_loop(None)
@@ -0,0 +1,82 @@
+import asyncio
+import datetime
+import threading
+
+from botocore.credentials import RefreshableCredentials
+
+from aiopolly.utils import credentials as credentials_module
+from aiopolly.utils.credentials import CredentialsProvider, REFRESH_MARGIN
+
+
+def make_metadata(n: int, expires_in: float) -> dict:
+    expiry_time = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=expires_in)
+    return {'access_key': f'AK{n}', 'secret_key': f'SK{n}', 'token': f'T{n}', 'expiry_time': expiry_time.isoformat()}
+
+
+def test_close_cancels_refresh_in_progress(run, monkeypatch):
+    monkeypatch.setattr(credentials_module, 'REFRESH_RETRY_DELAY', 0.01)
+    fetching, release = threading.Event(), threading.Event()
+
+    def fetch():
+        fetching.set()
+        release.wait(5)
+        return make_metadata(2, REFRESH_MARGIN + 60)
+
+    provider = CredentialsProvider()
+    provider._credentials = RefreshableCredentials.create_from_metadata(
+        make_metadata(1, REFRESH_MARGIN + 0.05), fetch, 'test'
+    )
+
+    async def main():
+        assert (await provider.load()).access_key == 'AK1'
+        assert provider._refresh_handle is not None
+
+        loop = asyncio.get_event_loop()
+        assert await loop.run_in_executor(None, fetching.wait, 5)
+        refresh_task = provider._refresh_task
+        assert refresh_task is not None and not refresh_task.done()
+
+        provider.close()
+        release.set()
+        await asyncio.sleep(0.1)
+
+        assert refresh_task.cancelled()
+        assert provider._refresh_task is None
+        assert provider._refresh_handle is None
+
+    try:
+        run(main())
+    finally:
+        release.set()
+
+
+def test_close_cancels_load_in_progress(run):
+    fetching, release = threading.Event(), threading.Event()
+
+    def fetch():
+        fetching.set()
+        release.wait(5)
+        return make_metadata(2, REFRESH_MARGIN + 60)
+
+    provider = CredentialsProvider()
+    # Expiring credentials are refreshed by botocore inside get_frozen_credentials()
+    provider._credentials = RefreshableCredentials.create_from_metadata(make_metadata(1, 0), fetch, 'test')
+
+    async def main():
+        load = asyncio.ensure_future(provider.load())
+
+        loop = asyncio.get_event_loop()
+        assert await loop.run_in_executor(None, fetching.wait, 5)
+
+        provider.close()
+        release.set()
+        await asyncio.sleep(0.1)
+
+        assert load.cancelled()
+        assert provider._loading is None
+        assert provider._refresh_handle is None
+
+    try:
+        run(main())
+    finally:
+        release.set()
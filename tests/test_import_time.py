@@ -0,0 +1,55 @@
+import os
+import pathlib
+import subprocess
+import sys
+from typing import List, Tuple
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+# Same budget as benchmarks/import_time.py, the best of a few runs is checked, so a slow CI machine doesn't fail it
+BUDGET_MS = 500
+RUNS = 3
+
+LAZY_MODULES = [
+    'aiofiles',
+    'botocore',
+    'aiopolly.utils.cache.disk_cache',
+    'aiopolly.utils.converter.opus_converter',
+    'aiopolly.utils.ssml',
+]
+
+CODE = 'import sys, aiopolly; print(",".join(sys.modules))'
+
+
+def import_aiopolly() -> Tuple[float, List[str]]:
+    """
+    :return: import time of aiopolly in ms, modules imported in the process
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (str(ROOT), os.environ.get('PYTHONPATH')))))
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', CODE],
+                             env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True,
+                             check=True)
+
+    for line in process.stderr.splitlines():
+        if line.startswith('import time:') and line.rstrip().endswith('| aiopolly'):
+            cumulative = line[len('import time:'):].split('|')[1]
+            return int(cumulative) / 1000, process.stdout.strip().split(',')
+    raise AssertionError(f'aiopolly is not found in import time report:\n{process.stderr}')
+
+
+@pytest.fixture(scope='module')
+def imports() -> List[Tuple[float, List[str]]]:
+    return [import_aiopolly() for _ in range(RUNS)]
+
+
+def test_import_time_is_within_budget(imports):
+    best = min(import_time for import_time, _ in imports)
+    assert best <= BUDGET_MS, f'import aiopolly takes {best:.1f} ms, budget is {BUDGET_MS} ms'
+
+
+@pytest.mark.parametrize('module', LAZY_MODULES)
+def test_module_is_imported_lazily(imports, module):
+    _, modules = imports[0]
+    assert module not in modules
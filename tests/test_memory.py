@@ -0,0 +1,34 @@
+import gc
+import weakref
+
+from aiopolly import Polly, types
+from aiopolly.testing import FakePollyServer
+
+ITERATIONS = 300
+
+TEXTS = [
+    'Hello {}!',
+    '<speak>Your call is <emphasis>important</emphasis> to us {}.</speak>',
+]
+
+
+def test_speech_is_freed_after_use(run):
+    synthesized = weakref.WeakSet()
+
+    async def synthesize_loop():
+        async with FakePollyServer() as server:
+            async with Polly(base_url=server.url, access_key='test', secret_key='test',
+                             voice_id=types.VoiceID.Joanna, output_format=types.AudioFormat.mp3) as polly:
+                Polly.set_current(polly)
+                for n in range(ITERATIONS):
+                    text = TEXTS[n % len(TEXTS)].format(n)
+                    speech = await polly.synthesize_speech(text, text_type='ssml' if n % 2 else 'text')
+                    # Derived properties, which used to keep speech alive in class-level lru_cache
+                    assert speech.clean_text
+                    assert speech.polly is polly
+                    synthesized.add(speech)
+
+    run(synthesize_loop())
+    gc.collect()
+
+    assert len(synthesized) == 0
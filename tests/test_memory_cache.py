@@ -0,0 +1,47 @@
+import pytest
+
+from aiopolly import types
+from aiopolly.utils.cache import DiskCache, MemoryCache
+
+SPEECH_PARAMS = dict(content_type='audio/mpeg', request_characters='5', text='Hello', voice_id='Joanna',
+                     output_format='mp3')
+
+
+@pytest.fixture(params=[types.Speech, types.CompactSpeech])
+def speech_class(request):
+    return request.param
+
+
+def test_stored_speech_is_not_changed_by_original(run, speech_class):
+    cache = MemoryCache()
+    speech = speech_class(audio_stream=b'original', **SPEECH_PARAMS)
+
+    run(cache.set('key', speech))
+    speech.audio_stream = b'changed'
+
+    assert run(cache.get('key')).audio_stream == b'original'
+
+
+def test_stored_speech_is_not_changed_by_returned(run, speech_class):
+    cache = MemoryCache()
+    run(cache.set('key', speech_class(audio_stream=b'original', **SPEECH_PARAMS)))
+
+    speech = run(cache.get('key'))
+    # The same assignments as made by OpusConverter
+    speech.audio_stream = speech.converted_stream = b'converted'
+    speech.converted = True
+
+    cached = run(cache.get('key'))
+    assert cached.audio_stream == b'original'
+    assert not cached.converted
+
+
+def test_promoted_speech_is_not_changed_by_returned(run, speech_class, tmp_path):
+    lower_tier = DiskCache(str(tmp_path), speech_class=speech_class)
+    run(lower_tier.set('key', speech_class(audio_stream=b'original', **SPEECH_PARAMS)))
+    cache = MemoryCache(lower_tier=lower_tier)
+
+    run(cache.get('key')).audio_stream = b'changed'
+
+    assert 'key' in cache
+    assert run(cache.get('key')).audio_stream == b'original'
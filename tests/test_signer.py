@@ -0,0 +1,70 @@
+import datetime
+from unittest import mock
+
+import pytest
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
+
+from aiopolly.polly.polly import Methods
+from aiopolly.utils import json
+from aiopolly.utils.signer import SigV4Signer
+
+NOW = datetime.datetime(2019, 12, 31, 23, 59, 59)
+REGION = 'eu-central-1'
+SERVICE = 'polly'
+
+CREDENTIALS = {
+    'without_token': Credentials('AKIDEXAMPLE', 'wJalrXUtnFEMI/K7MDENG+bPxRfiCYEXAMPLEKEY'),
+    'with_token': Credentials('ASIAEXAMPLE', 'secret', token='session  token/with+symbols=='),
+}
+
+REQUESTS = {
+    'payload': ('POST', 'https://polly.eu-central-1.amazonaws.com/v1/speech',
+                json.dumps({'Text': 'Hello', 'VoiceId': 'Joanna', 'OutputFormat': 'mp3'})),
+    'non_ascii_payload': ('POST', 'https://polly.eu-central-1.amazonaws.com/v1/speech',
+                          json.dumps({'Text': 'Привет, мир! 你好', 'VoiceId': 'Joanna', 'OutputFormat': 'mp3'})),
+    'query_string': ('GET', 'https://polly.eu-central-1.amazonaws.com/v1/voices'
+                            '?LanguageCode=en-US&IncludeAdditionalLanguageCodes=true&NextToken=a%2Bb%3D%3D', None),
+    'default_port': ('GET', 'https://polly.us-east-1.amazonaws.com:443/v1/lexicons/my_lexicon~1', None),
+    'non_default_port': ('PUT', 'http://127.0.0.1:8080/v1/lexicons/Lexicon', json.dumps({'Content': '<lexicon/>'})),
+    'quoted_path': ('DELETE', 'http://localhost:80/v1/lexicons/Lexicon%20Name', ''),
+    'route_quoted_path': ('GET', Methods.GetLexicon.get_url('https://polly.eu-central-1.amazonaws.com',
+                                                            {'LexiconName': 'Lexicon Name/1'}), None),
+}
+
+
+def sign_with_botocore(credentials, request_method: str, url: str, payload: str = None) -> dict:
+    request = AWSRequest(method=request_method, url=url, data=payload)
+    with mock.patch('botocore.auth.datetime') as botocore_datetime:
+        botocore_datetime.datetime.utcnow.return_value = NOW
+        SigV4Auth(credentials, SERVICE, REGION).add_auth(request)
+    return dict(request.headers.items())
+
+
+@pytest.mark.parametrize('credentials', CREDENTIALS.values(), ids=list(CREDENTIALS))
+@pytest.mark.parametrize('request_method, url, payload', REQUESTS.values(), ids=list(REQUESTS))
+def test_headers_match_botocore(credentials, request_method, url, payload):
+    headers = SigV4Signer(credentials, REGION, SERVICE).sign(request_method, url, payload, now=NOW)
+
+    assert headers == sign_with_botocore(credentials, request_method, url, payload)
+
+
+def test_signing_key_is_cached_per_date():
+    signer = SigV4Signer(CREDENTIALS['without_token'], REGION, SERVICE)
+    request_method, url, payload = REQUESTS['payload']
+
+    signer.sign(request_method, url, payload, now=NOW)
+    signing_key = signer._signing_key
+    signer.sign(request_method, url, payload, now=NOW - datetime.timedelta(hours=1))
+    assert signer._signing_key is signing_key
+
+    next_day = NOW + datetime.timedelta(days=1)
+    headers = signer.sign(request_method, url, payload, now=next_day)
+    assert signer._signing_key is not signing_key
+    assert headers['X-Amz-Date'] == next_day.strftime('%Y%m%dT%H%M%SZ')
+
+
+def test_signing_without_credentials_fails():
+    with pytest.raises(RuntimeError):
+        SigV4Signer(None, REGION, SERVICE).sign('GET', 'https://polly.eu-central-1.amazonaws.com/v1/voices')
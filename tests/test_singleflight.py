@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from aiopolly.utils.singleflight import SingleFlight
+
+
+def test_concurrent_calls_are_shared(run):
+    single_flight = SingleFlight()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value
+
+    async def main():
+        return await asyncio.gather(*(single_flight.do('key', fetch, n) for n in range(10)))
+
+    assert run(main()) == [0] * 10
+    assert calls == [0]
+    assert len(single_flight) == 0
+
+
+def test_call_after_cancelled_one_starts_fresh(run):
+    single_flight = SingleFlight()
+
+    async def fetch(value):
+        await asyncio.sleep(0.01)
+        return value
+
+    async def main():
+        waiter = asyncio.ensure_future(single_flight.do('key', fetch, 1))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert 'key' not in single_flight
+
+        # Done callback of the cancelled call hasn't run yet
+        return await single_flight.do('key', fetch, 2)
+
+    assert run(main()) == 2
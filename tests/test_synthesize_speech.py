@@ -0,0 +1,33 @@
+import asyncio
+
+from aiopolly import Polly, types
+from aiopolly.testing import FakePollyServer
+from aiopolly.utils.cache import MemoryCache
+
+CONCURRENCY = 10
+
+
+class CountingCache(MemoryCache):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writes = 0
+
+    async def set(self, key: str, speech: types.Speech):
+        self.writes += 1
+        await super().set(key, speech)
+
+
+def test_coalesced_speech_is_cached_once(run):
+    cache = CountingCache()
+
+    async def main():
+        async with FakePollyServer(latency=0.05) as server:
+            async with Polly(base_url=server.url, access_key='test', secret_key='test', cache=cache,
+                             voice_id=types.VoiceID.Joanna, output_format=types.AudioFormat.mp3) as polly:
+                return await asyncio.gather(*(polly.synthesize_speech('Hello!') for _ in range(CONCURRENCY)))
+
+    speeches = run(main())
+
+    assert cache.writes == 1
+    assert len({id(speech) for speech in speeches}) == CONCURRENCY
+    assert len({speech.audio_stream for speech in speeches}) == 1